@@ -6,7 +6,7 @@ Handles automatic token refresh and session management
 import time
 import threading
 from datetime import datetime, timedelta
-from typing import Optional, Callable
+from typing import Optional, Callable, Tuple
 from zerodha_auth import zerodha_auth
 from trade_logger import trade_logger
 
@@ -16,39 +16,80 @@ class AutoTokenRefresher:
     
     def __init__(self, check_interval: int = 300):  # Check every 5 minutes
         self.check_interval = check_interval
-        self.is_running = False
+        self._stop_evt = threading.Event()
+        self._stop_evt.set()
+        self._kick_evt = threading.Event()
         self.refresh_thread: Optional[threading.Thread] = None
-        self.callbacks: list = []
-        self.last_check: Optional[datetime] = None
+        # Replaced wholesale on add/remove so readers can iterate without a lock
+        self._callbacks: Tuple[Callable, ...] = ()
+        # Monotonic stamp for interval maths, wall stamp only for display
+        self.last_check_monotonic: Optional[float] = None
+        self.last_check_wall: Optional[float] = None
         self.session_expiry_buffer = timedelta(minutes=30)  # Refresh 30 min before expiry
+        self.validity_ttl = timedelta(seconds=60)
+        # (access_token, monotonic expires_at, result) of the last live validation
+        self._validity_cache: Optional[Tuple[Optional[str], float, bool]] = None
+    
+    @property
+    def is_running(self) -> bool:
+        """Whether the refresh loop is active"""
+        return not self._stop_evt.is_set()
     
     def add_callback(self, callback: Callable) -> None:
         """Add callback to be called when token is refreshed"""
-        self.callbacks.append(callback)
+        self._callbacks = self._callbacks + (callback,)
     
     def remove_callback(self, callback: Callable) -> None:
         """Remove callback"""
-        if callback in self.callbacks:
-            self.callbacks.remove(callback)
+        callbacks = list(self._callbacks)
+        if callback in callbacks:
+            callbacks.remove(callback)
+            self._callbacks = tuple(callbacks)
     
     def _notify_callbacks(self) -> None:
         """Notify all callbacks about token refresh"""
-        for callback in self.callbacks:
+        errors = []
+        for callback in self._callbacks:
             try:
                 callback()
             except Exception as e:
-                trade_logger.log_error(f"Callback error: {str(e)}")
+                errors.append(e)
+        
+        # Log after the fan-out so callbacks never wait on the logger
+        for e in errors:
+            trade_logger.log_error(f"Callback error: {str(e)}")
     
-    def check_token_validity(self) -> bool:
-        """Check if current token is valid"""
+    def invalidate_validity_cache(self) -> None:
+        """Drop the cached token validation result"""
+        self._validity_cache = None
+    
+    def check_token_validity(self, force: bool = False) -> bool:
+        """Check if current token is valid
+        
+        Results are cached per access token for ``validity_ttl``; pass
+        ``force=True`` to always hit ``zerodha_auth``.
+        """
+        token = zerodha_auth.access_token
+        now = time.monotonic()
+        cached = self._validity_cache
+        
+        if not force and cached is not None:
+            cached_token, expires_at, result = cached
+            if cached_token == token and now < expires_at:
+                return result
+        
         try:
-            return zerodha_auth.validate_session()
+            result = zerodha_auth.validate_session(force=force)
         except Exception as e:
             trade_logger.log_error(f"Token validation error: {str(e)}")
-            return False
+            result = False
+        
+        self._validity_cache = (token, now + self.validity_ttl.total_seconds(), result)
+        return result
     
     def refresh_token(self) -> bool:
         """Refresh access token"""
+        self.invalidate_validity_cache()
         try:
             if not zerodha_auth.is_authenticated():
                 trade_logger.log_warning("No valid session found. Manual authentication required.")
@@ -65,10 +106,8 @@ class AutoTokenRefresher:
     
     def _refresh_loop(self) -> None:
         """Main refresh loop"""
-        while self.is_running:
+        while not self._stop_evt.is_set():
             try:
-                current_time = datetime.now()
-                
                 # Check token validity
                 if not self.check_token_validity():
                     trade_logger.log_warning("Invalid token detected. Attempting refresh...")
@@ -79,12 +118,15 @@ class AutoTokenRefresher:
                     else:
                         trade_logger.log_error("Token refresh failed. Manual intervention required.")
                 
-                self.last_check = current_time
-                time.sleep(self.check_interval)
+                self.last_check_monotonic = time.monotonic()
+                self.last_check_wall = time.time()
                 
             except Exception as e:
                 trade_logger.log_error(f"Refresh loop error: {str(e)}")
-                time.sleep(self.check_interval)
+            
+            # Returns early when stop() or force_check() sets the kick event
+            self._kick_evt.wait(self.check_interval)
+            self._kick_evt.clear()
     
     def start(self) -> None:
         """Start the auto refresh service"""
@@ -92,7 +134,8 @@ class AutoTokenRefresher:
             trade_logger.log_warning("Auto refresher is already running")
             return
         
-        self.is_running = True
+        self._stop_evt.clear()
+        self._kick_evt.clear()
         self.refresh_thread = threading.Thread(target=self._refresh_loop, daemon=True)
         self.refresh_thread.start()
         
@@ -103,28 +146,60 @@ class AutoTokenRefresher:
         if not self.is_running:
             return
         
-        self.is_running = False
+        self._stop_evt.set()
+        self._kick_evt.set()
         
         if self.refresh_thread and self.refresh_thread.is_alive():
             self.refresh_thread.join(timeout=5)
         
         trade_logger.log_info("Auto token refresher stopped")
     
+    def _cached_validity(self) -> Optional[bool]:
+        """Last validation result for the current token, None if stale"""
+        cached = self._validity_cache
+        if cached is None:
+            return None
+        
+        cached_token, expires_at, result = cached
+        if cached_token != zerodha_auth.access_token or time.monotonic() >= expires_at:
+            return None
+        return result
+    
     def get_status(self) -> dict:
-        """Get refresher status"""
+        """Get refresher status
+        
+        Never triggers a live session check; ``token_valid`` is the cached
+        result, or None when no fresh validation is available. Use
+        ``get_status_live`` to force one.
+        """
+        # Snapshot fields written by other threads before formatting
+        is_running = self.is_running
+        last_check = self.last_check_wall
+        callbacks_count = len(self._callbacks)
+        
         return {
-            "is_running": self.is_running,
-            "last_check": self.last_check.isoformat() if self.last_check else None,
+            "is_running": is_running,
+            "last_check": datetime.fromtimestamp(last_check).isoformat() if last_check else None,
             "check_interval": self.check_interval,
-            "token_valid": self.check_token_validity(),
-            "callbacks_count": len(self.callbacks)
+            "token_valid": self._cached_validity(),
+            "callbacks_count": callbacks_count
         }
     
+    def get_status_live(self) -> dict:
+        """Get refresher status with a fresh token validation"""
+        status = self.get_status()
+        status["token_valid"] = self.check_token_validity(force=True)
+        return status
+    
     def force_check(self) -> bool:
         """Force an immediate token check"""
         trade_logger.log_info("Forcing token validation check")
         
-        if not self.check_token_validity():
+        valid = self.check_token_validity(force=True)
+        # Restart the loop's interval from this check
+        self._kick_evt.set()
+        
+        if not valid:
             trade_logger.log_warning("Token invalid. Attempting refresh...")
             return self.refresh_token()
         
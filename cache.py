@@ -0,0 +1,105 @@
+"""
+Shared cache module for Sandy Viper Bot
+Optional Redis-backed store so bot processes can reuse recent NSE responses
+Enabled by setting REDIS_URL; every call is a no-op otherwise
+"""
+
+import json
+import os
+import time
+from typing import Any, Optional
+from trade_logger import trade_logger
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class SharedCache:
+    """Short-TTL JSON cache shared across bot processes"""
+    
+    def __init__(self, url: Optional[str] = None, prefix: str = "viper:"):
+        self.url = url or os.getenv("REDIS_URL")
+        self.prefix = prefix
+        self.client = None
+        self.retry_after = 30.0  # Seconds to back off after a Redis failure
+        self._down_until = 0.0
+        
+        if self.url and redis is not None:
+            try:
+                self.client = redis.Redis.from_url(
+                    self.url,
+                    decode_responses=False,
+                    socket_timeout=0.2,
+                    socket_connect_timeout=0.2
+                )
+            except Exception as e:
+                trade_logger.log_error(f"Shared cache init error: {str(e)}")
+                self.client = None
+    
+    @property
+    def enabled(self) -> bool:
+        """Whether Redis is configured and not backing off"""
+        return self.client is not None and time.monotonic() >= self._down_until
+    
+    def _failed(self, action: str, e: Exception) -> None:
+        """Back off for a while instead of erroring on every call"""
+        self._down_until = time.monotonic() + self.retry_after
+        trade_logger.log_warning(f"Shared cache {action} failed, bypassing for {self.retry_after:.0f}s: {str(e)}")
+    
+    def get_json(self, key: str) -> Optional[Any]:
+        """Get a cached JSON value, None on miss"""
+        if not self.enabled:
+            return None
+        
+        try:
+            raw = self.client.get(self.prefix + key)
+        except Exception as e:
+            self._failed("get", e)
+            return None
+        
+        if raw is None:
+            return None
+        return orjson.loads(raw) if orjson else json.loads(raw)
+    
+    def setex_json(self, key: str, ttl: float, value: Any) -> None:
+        """Cache a JSON-serializable value for ttl seconds"""
+        if not self.enabled:
+            return
+        
+        try:
+            raw = orjson.dumps(value) if orjson else json.dumps(value).encode()
+            self.client.set(self.prefix + key, raw, px=int(ttl * 1000))
+        except Exception as e:
+            self._failed("set", e)
+    
+    def acquire(self, key: str, ttl: float) -> bool:
+        """Take a short fetch lock so only one process refreshes a key"""
+        if not self.enabled:
+            return True
+        
+        try:
+            return bool(self.client.set(self.prefix + key + ":lock", b"1", nx=True, px=int(ttl * 1000)))
+        except Exception as e:
+            self._failed("lock", e)
+            return True
+    
+    def release(self, key: str) -> None:
+        """Release a fetch lock taken with acquire"""
+        if not self.enabled:
+            return
+        
+        try:
+            self.client.delete(self.prefix + key + ":lock")
+        except Exception as e:
+            self._failed("unlock", e)
+
+
+# Global shared cache instance
+shared_cache = SharedCache()
@@ -1,10 +1,21 @@
 import os
 MODE = os.getenv("MODE","paper")
+DEMO_MODE = os.getenv("DEMO_MODE","0").lower() in ("1","true","yes")  # run demo_* in the status loop
 TZ = "Asia/Kolkata"
 ENTRY_POLICY = {"product":"MIS","order_type":"MARKET"}
 TIME_WINDOWS = {"morning":("09:30","12:00"),"midday":("12:00","13:30"),"afternoon":("13:30","15:00")}
 
 MARKET = {"open":"09:15","close":"15:30","force_exit":"15:15"}
+
+def hm(s: str) -> int:
+    """'HH:MM' -> minutes since midnight"""
+    h, m = s.split(":")
+    return int(h)*60 + int(m)
+
+# Same schedule as integer minutes for hot-path comparisons
+MARKET_MIN = {k: hm(v) for k, v in MARKET.items()}
+TIME_WINDOWS_MIN = {k: (hm(a), hm(b)) for k, (a, b) in TIME_WINDOWS.items()}
+NO_NEW_ENTRY_MIN = hm("14:00")
 AWARENESS = {"skew_min":1.2,"velocity_z_min":1.5,"lr_slope_min":2.5,"early_entry_sec":120}
 
 VIX_BANDS = {"low":12.0,"mid":16.0,"high":20.0,"extreme":23.0}
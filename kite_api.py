@@ -1,7 +1,8 @@
+from collections import deque
 from zerodha_auth import ensure_session
 from config import ENTRY_POLICY
 
-_order_queue = []  # queued on session failure
+_order_queue = deque()  # queued on session failure
 
 def place_market(symbol:str, qty:int, side:str):
     # Manual token policy: ensure_session validates existing token (no auto-refresh)
@@ -17,14 +18,19 @@ def place_market(symbol:str, qty:int, side:str):
 def flush_queue():
     placed=0
     failed=0
-    tmp=list(_order_queue)
-    _order_queue.clear()
-    for it in tmp:
+    retry=[]
+    # Drain with popleft so orders queued concurrently are never dropped
+    for _ in range(len(_order_queue)):
+        try:
+            it=_order_queue.popleft()
+        except IndexError:
+            break
         try:
             ensure_session()
             print(f"[PAPER][FLUSH] {it['side']} {it['symbol']} x{it['qty']}")
             placed+=1
         except Exception:
             failed+=1
-            _order_queue.append(it)
+            retry.append(it)
+    _order_queue.extend(retry)
     return {'placed':placed,'failed':failed,'remaining':len(_order_queue)}
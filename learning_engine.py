@@ -1,10 +1,103 @@
-import json, os, time
+import atexit, json, os, queue, threading, time
+from trade_logger import trade_logger
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 LOG_PATH = os.getenv('LEARNING_LOG_PATH','learning_trades.jsonl')
+FLUSH_EVERY = 64        # records
+FLUSH_INTERVAL = 0.5    # seconds
+RETRY_INTERVAL = 60.0   # seconds before reopening after the log can't be opened
+
+_q = queue.SimpleQueue()
+_writer = None
+_writer_lock = threading.Lock()
+_STOP = object()
+_retry_at = 0.0         # monotonic time before which no new writer is started
+
+if orjson is not None:
+    def _encode(record: dict) -> bytes:
+        try:
+            return orjson.dumps(record, option=orjson.OPT_SERIALIZE_NUMPY) + b"\n"
+        except TypeError:
+            return (json.dumps(record, default=str) + "\n").encode()
+else:
+    def _encode(record: dict) -> bytes:
+        return (json.dumps(record) + "\n").encode()
+
+def _drain() -> None:
+    # Single long-lived handle; callers only pay for a queue put
+    global _retry_at
+    try:
+        f = open(LOG_PATH,'ab',buffering=1<<16)
+    except Exception as e:
+        # Stop log_features enqueuing until the retry window passes, and drop
+        # what was queued for this writer so the queue can't grow unbounded
+        _retry_at = time.monotonic() + RETRY_INTERVAL
+        dropped = 0
+        while True:
+            try:
+                _q.get_nowait()
+                dropped += 1
+            except queue.Empty:
+                break
+        trade_logger.log_error(f"Error opening learning log {LOG_PATH}: {e} ({dropped} records dropped, retrying in {RETRY_INTERVAL:.0f}s)")
+        return
+    pending = 0
+    failing = False  # log only the first error of a run of failed writes
+    with f:
+        while True:
+            try:
+                line = _q.get(timeout=FLUSH_INTERVAL)
+            except queue.Empty:
+                line = None
+            if line is _STOP:
+                break
+            try:
+                if line is not None:
+                    f.write(line)
+                    pending += 1
+                if pending >= FLUSH_EVERY or (line is None and pending):
+                    f.flush(); pending = 0
+                failing = False
+            except Exception as e:
+                pending = 0
+                if not failing:
+                    failing = True
+                    trade_logger.log_error(f"Error writing learning log {LOG_PATH}: {e}")
+
+def _ensure_writer() -> bool:
+    global _writer
+    if _writer is not None and _writer.is_alive():
+        return True
+    if time.monotonic() < _retry_at:
+        return False
+    with _writer_lock:
+        if _writer is None or not _writer.is_alive():
+            if time.monotonic() < _retry_at:
+                return False
+            _writer = threading.Thread(target=_drain, name='learning-writer', daemon=True)
+            _writer.start()
+    return True
+
+def close() -> None:
+    """Flush pending features and stop the writer thread."""
+    global _writer
+    with _writer_lock:
+        if _writer is None or not _writer.is_alive():
+            _writer = None
+            return
+        _q.put(_STOP)
+        _writer.join(timeout=5)
+        _writer = None
+
+atexit.register(close)
 
 def log_features(features: dict) -> None:
     try:
-        with open(LOG_PATH,'a') as f:
-            f.write(json.dumps({"ts":int(time.time()), **features})+"\n")
+        if not _ensure_writer():
+            return
+        _q.put_nowait(_encode({"ts":int(time.time()), **features}))
     except Exception:
         pass
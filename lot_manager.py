@@ -3,13 +3,41 @@ Lot manager module for Sandy Viper Bot
 Handles position sizing, risk management, and lot calculations
 """
 
-from typing import Dict, Optional, Tuple
-from datetime import datetime
+import functools
+import itertools
+import time
+from collections import defaultdict
+from types import MappingProxyType
+from typing import Dict, List, Optional, Tuple
 from config import config
 from trade_logger import trade_logger
 from kite_api import kite_api
 from config import GLOBAL_EXPOSURE_CAP, MAX_TRADES_PER_INSTRUMENT
 
+_LOT_SIZES = MappingProxyType({
+    'NIFTY': 50,
+    'BANKNIFTY': 15,
+    'FINNIFTY': 40,
+    'MIDCPNIFTY': 75,
+    'SENSEX': 10,
+    'BANKEX': 15
+})
+
+# Process-wide position id sequence; unique even for bursts within a second
+_position_ids = itertools.count(1)
+
+
+@functools.lru_cache(maxsize=4096)
+def _lot_for(symbol: str) -> int:
+    """Resolve lot size for a raw symbol (memoized)"""
+    return _LOT_SIZES.get(symbol.partition('_')[0].upper(), 1)
+
+
+def _position_lots(risk_amount: float, price_diff: float, lot_size: int) -> int:
+    """Whole lots affordable for a risk budget and per-share risk"""
+    return int(risk_amount / price_diff) // lot_size
+
+
 _open_exposures: Dict[str, float] = {}
 _trade_counts: Dict[str, int] = {}
 
@@ -36,39 +64,34 @@ class LotManager:
         self.config = config
         self.daily_pnl = 0.0
         self.open_positions = {}
-        self.lot_sizes = {
-            'NIFTY': 50,
-            'BANKNIFTY': 15,
-            'FINNIFTY': 40,
-            'MIDCPNIFTY': 75,
-            'SENSEX': 10,
-            'BANKEX': 15
-        }
+        self.lot_sizes = _LOT_SIZES
+        
+        # Secondary index and running aggregates, maintained on add/remove
+        self._by_symbol: Dict[str, List[str]] = defaultdict(list)
+        self._exposure_total = 0.0
+        self._unrealized_total = 0.0
     
     def get_lot_size(self, symbol: str) -> int:
         """Get lot size for a symbol"""
-        # Extract base symbol
-        base_symbol = symbol.split('_')[0] if '_' in symbol else symbol
-        return self.lot_sizes.get(base_symbol.upper(), 1)
+        return _lot_for(symbol)
     
     def calculate_position_size(self, symbol: str, entry_price: float, 
                               stop_loss: float, risk_amount: Optional[float] = None) -> int:
         """Calculate optimal position size based on risk"""
         try:
             if risk_amount is None:
-                risk_amount = self.config.trading.max_position_size * self.config.trading.risk_per_trade
+                trading = self.config.trading
+                risk_amount = trading.max_position_size * trading.risk_per_trade
             
             price_diff = abs(entry_price - stop_loss)
             if price_diff == 0:
                 trade_logger.log_warning("Stop loss same as entry price")
                 return 0
             
-            lot_size = self.get_lot_size(symbol)
-            risk_per_share = price_diff
-            max_quantity = int(risk_amount / risk_per_share)
+            lot_size = _lot_for(symbol)
             
             # Round down to nearest lot
-            lots = max_quantity // lot_size
+            lots = _position_lots(risk_amount, price_diff, lot_size)
             quantity = lots * lot_size
             
             trade_logger.log_info(f"Position size calculation for {symbol}: "
@@ -83,14 +106,16 @@ class LotManager:
     def check_risk_limits(self, symbol: str, quantity: int, price: float) -> bool:
         """Check if trade is within risk limits"""
         try:
+            trading = self.config.trading
+            
             # Check position value limit
             position_value = quantity * price
-            if position_value > self.config.trading.max_position_size:
+            if position_value > trading.max_position_size:
                 trade_logger.log_warning(f"Position value {position_value} exceeds limit")
                 return False
             
             # Check daily loss limit
-            if self.daily_pnl < -self.config.trading.max_daily_loss:
+            if self.daily_pnl < -trading.max_daily_loss:
                 trade_logger.log_warning(f"Daily loss limit exceeded: {self.daily_pnl}")
                 return False
             
@@ -126,7 +151,7 @@ class LotManager:
                     order_type: str, strategy: str = "manual") -> bool:
         """Add a new position to tracking"""
         try:
-            position_id = f"{symbol}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            position_id = f"{symbol}_{next(_position_ids)}"
             
             self.open_positions[position_id] = {
                 'symbol': symbol,
@@ -134,9 +159,12 @@ class LotManager:
                 'entry_price': entry_price,
                 'order_type': order_type,
                 'strategy': strategy,
-                'entry_time': datetime.now(),
-                'unrealized_pnl': 0.0
+                'entry_time': time.time(),
+                'unrealized_pnl': 0.0,
+                '_is_buy': order_type.upper() == 'BUY'
             }
+            self._by_symbol[symbol].append(position_id)
+            self._exposure_total += quantity * entry_price
             
             trade_logger.log_info(f"Position added: {position_id}")
             return True
@@ -157,7 +185,7 @@ class LotManager:
             entry_price = position['entry_price']
             
             # Calculate P&L
-            if position['order_type'].upper() == 'BUY':
+            if position['_is_buy']:
                 pnl = (exit_price - entry_price) * quantity
             else:
                 pnl = (entry_price - exit_price) * quantity
@@ -166,6 +194,7 @@ class LotManager:
             self.daily_pnl += pnl
             
             # Remove position
+            self._unindex_position(position_id)
             del self.open_positions[position_id]
             
             trade_logger.log_info(f"Position closed: {position_id}, P&L: {pnl}")
@@ -175,43 +204,97 @@ class LotManager:
             trade_logger.log_error(f"Remove position error: {str(e)}")
             return None
     
+    def _unindex_position(self, position_id: str) -> None:
+        """Drop a position from the symbol index and running aggregates"""
+        position = self.open_positions[position_id]
+        symbol = position['symbol']
+        
+        position_ids = self._by_symbol.get(symbol)
+        if position_ids and position_id in position_ids:
+            position_ids.remove(position_id)
+            if not position_ids:
+                del self._by_symbol[symbol]
+        
+        self._exposure_total -= position['quantity'] * position['entry_price']
+        self._unrealized_total -= position['unrealized_pnl']
+        
+        if len(self.open_positions) <= 1:
+            # Reset accumulated float drift once the book is flat
+            self._exposure_total = 0.0
+            self._unrealized_total = 0.0
+    
     def update_unrealized_pnl(self) -> Dict[str, float]:
         """Update unrealized P&L for all open positions"""
         total_unrealized = 0.0
         position_pnls = {}
         
         try:
-            for position_id, position in self.open_positions.items():
-                symbol = position['symbol']
-                current_price = kite_api.get_ltp([symbol])
+            if not self.open_positions:
+                return position_pnls
+            
+            # One LTP request for every open symbol instead of one per position
+            ltps = self._fetch_ltps(list(self._by_symbol.keys()))
+            
+            for symbol, position_ids in self._by_symbol.items():
+                ltp = ltps.get(symbol)
                 
-                if current_price and current_price.get("status") == "success":
-                    ltp = current_price["data"][symbol]["last_price"]
-                    quantity = position['quantity']
-                    entry_price = position['entry_price']
+                for position_id in position_ids:
+                    position = self.open_positions[position_id]
                     
-                    if position['order_type'].upper() == 'BUY':
-                        unrealized_pnl = (ltp - entry_price) * quantity
-                    else:
-                        unrealized_pnl = (entry_price - ltp) * quantity
+                    if ltp is not None:
+                        quantity = position['quantity']
+                        entry_price = position['entry_price']
+                        
+                        if position['_is_buy']:
+                            unrealized_pnl = (ltp - entry_price) * quantity
+                        else:
+                            unrealized_pnl = (entry_price - ltp) * quantity
+                        
+                        position['unrealized_pnl'] = unrealized_pnl
+                        position_pnls[position_id] = unrealized_pnl
                     
-                    position['unrealized_pnl'] = unrealized_pnl
-                    position_pnls[position_id] = unrealized_pnl
-                    total_unrealized += unrealized_pnl
+                    total_unrealized += position['unrealized_pnl']
             
+            self._unrealized_total = total_unrealized
             return position_pnls
             
         except Exception as e:
             trade_logger.log_error(f"Update unrealized P&L error: {str(e)}")
             return {}
     
+    def _fetch_ltps(self, symbols: List[str]) -> Dict[str, float]:
+        """Fetch last traded prices for symbols in a single batched call"""
+        ltps = {}
+        
+        response = kite_api.get_ltp(symbols)
+        if not response or response.get("status") != "success":
+            # A failed batch means the API is down; retrying each symbol only adds load
+            return ltps
+        
+        data = response.get("data", {})
+        for symbol in symbols:
+            if symbol in data:
+                ltps[symbol] = data[symbol]["last_price"]
+        
+        # Fall back to per-symbol requests only for quotes missing from a successful batch
+        for symbol in symbols:
+            if symbol in ltps:
+                continue
+            response = kite_api.get_ltp([symbol])
+            if response and response.get("status") == "success":
+                quote = response.get("data", {}).get(symbol)
+                if quote:
+                    ltps[symbol] = quote["last_price"]
+        
+        return ltps
+    
     def get_position_summary(self) -> Dict:
         """Get summary of all positions"""
         try:
             # Update unrealized P&L
             self.update_unrealized_pnl()
             
-            total_unrealized = sum(pos['unrealized_pnl'] for pos in self.open_positions.values())
+            total_unrealized = self._unrealized_total
             total_positions = len(self.open_positions)
             
             return {
@@ -230,11 +313,7 @@ class LotManager:
     def _calculate_risk_utilization(self) -> float:
         """Calculate current risk utilization percentage"""
         try:
-            total_risk = 0.0
-            for position in self.open_positions.values():
-                position_value = position['quantity'] * position['entry_price']
-                total_risk += position_value
-            
+            total_risk = self._exposure_total
             max_risk = self.config.trading.max_position_size
             return (total_risk / max_risk) * 100 if max_risk > 0 else 0.0
             
@@ -3,10 +3,11 @@ Main entry point for Sandy Viper Bot
 Demonstrates the integration of all modules
 """
 
+import asyncio
+import random
 import sys
-import time
 from datetime import datetime
-from config import config
+from config import config, DEMO_MODE
 from trade_logger import trade_logger
 from zerodha_auth import zerodha_auth
 from auto_token_refresher import auto_refresher
@@ -14,6 +15,7 @@ from watchdog import watchdog
 from lot_manager import lot_manager
 from nse_data import nse_data
 from threading import Thread
+from utils.indicators import TechnicalIndicators
 
 try:
     from flask import Flask, jsonify
@@ -63,6 +65,10 @@ def initialize_bot():
     # Start auto token refresher
     print("🔄 Starting auto token refresher...")
     auto_refresher.start()
+    
+    # Keep NSE market data warm in memory
+    print("📡 Starting NSE data poller...")
+    nse_data.start_polling()
 
     # Start health server
     if _health_app:
@@ -123,8 +129,6 @@ def demo_technical_analysis():
     print("📈 Technical Analysis Demo")
     print("=" * 60)
     
-    from utils.indicators import TechnicalIndicators
-    
     # Sample price data
     sample_prices = [18450, 18465, 18480, 18470, 18485, 18495, 18475, 18490, 18505, 18485]
     
@@ -173,6 +177,52 @@ def demo_risk_management():
     print(f"   - Risk Check: {risk_status}")
 
 
+# Status refresh cadence (seconds); jittered so restarts don't align NSE calls
+STATUS_INTERVAL_OPEN = 30
+STATUS_INTERVAL_CLOSED = 300
+STATUS_JITTER = 0.2
+
+
+async def status_display_loop(wake: asyncio.Event) -> None:
+    """Refresh the status display, early when a watched component signals"""
+    while True:
+        # The status/demo calls block on I/O, so keep them off the event loop
+        await asyncio.to_thread(display_status)
+        
+        # Demo features, enabled with DEMO_MODE=1
+        if DEMO_MODE:
+            await asyncio.to_thread(demo_technical_analysis)
+            await asyncio.to_thread(demo_risk_management)
+        
+        base = STATUS_INTERVAL_OPEN if nse_data.is_market_open_now() else STATUS_INTERVAL_CLOSED
+        interval = base * (1 + random.uniform(-STATUS_JITTER, STATUS_JITTER))
+        print(f"\n⏰ Next update in {interval:.0f} seconds... (Current time: {datetime.now().strftime('%H:%M:%S')})")
+        
+        wake.clear()
+        try:
+            await asyncio.wait_for(wake.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def main_async() -> None:
+    """Run the bot's foreground tasks"""
+    loop = asyncio.get_running_loop()
+    wake = asyncio.Event()
+    
+    # Token refreshes and watchdog alerts arrive on worker threads
+    def _wake(*_args) -> None:
+        loop.call_soon_threadsafe(wake.set)
+    
+    auto_refresher.add_callback(_wake)
+    watchdog.add_alert_callback(_wake)
+    try:
+        await status_display_loop(wake)
+    finally:
+        auto_refresher.remove_callback(_wake)
+        watchdog.remove_alert_callback(_wake)
+
+
 def main():
     """Main function"""
     try:
@@ -184,21 +234,10 @@ def main():
         print("\n🚀 Sandy Viper Bot is running...")
         print("Press Ctrl+C to stop")
         
-        while True:
-            try:
-                # Display status every 30 seconds
-                display_status()
-                
-                # Demo features (comment out in production)
-                demo_technical_analysis()
-                demo_risk_management()
-                
-                print(f"\n⏰ Next update in 30 seconds... (Current time: {datetime.now().strftime('%H:%M:%S')})")
-                time.sleep(30)
-                
-            except KeyboardInterrupt:
-                print("\n\n🛑 Shutdown requested...")
-                break
+        try:
+            asyncio.run(main_async())
+        except KeyboardInterrupt:
+            print("\n\n🛑 Shutdown requested...")
                 
     except Exception as e:
         trade_logger.log_error(f"Critical error in main: {str(e)}")
@@ -209,6 +248,7 @@ def main():
         print("🧹 Cleaning up...")
         watchdog.stop()
         auto_refresher.stop()
+        nse_data.stop_polling()
         trade_logger.log_info("Sandy Viper Bot shutdown completed")
         print("👋 Sandy Viper Bot stopped successfully!")
 
@@ -4,14 +4,32 @@ Handles NSE market data fetching and processing for Indian markets
 All timings are in Indian Standard Time (IST)
 """
 
+import heapq
 import requests
+from bisect import bisect_right
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import threading
+import time
+import numpy as np
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
-import pytz
+from typing import Dict, List, Optional, Any, Tuple
+from zoneinfo import ZoneInfo
+try:
+    import orjson
+except ImportError:  # Optional fast JSON parser
+    orjson = None
+from cache import shared_cache
+from config import hm
 from kite_api import kite_api
 from trade_logger import trade_logger
 
+# Indian Standard Time
+IST = ZoneInfo('Asia/Kolkata')
+IST_FORMAT = '%Y-%m-%d %H:%M:%S IST'
+
 
 class NSEData:
     """NSE market data handler for Indian markets"""
@@ -29,18 +47,62 @@ class NSEData:
             'Cache-Control': 'no-cache',
             'Pragma': 'no-cache'
         })
+        # Pool sized for summary fan-out so bursts reuse keep-alive connections
+        self.session.mount('https://', HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=64,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 502, 503, 504])
+        ))
+        self._cookies_ready = False
+        self._prewarm_lock = threading.Lock()
+        self._prewarm_retry_at = 0.0  # Monotonic time before which a failed prewarm isn't retried
+        self.prewarm_retry_delay = 30.0  # Seconds between cookie prewarm attempts after a failure
+        self.request_timeout = 15
+        
+        # Seconds a response may be shared across processes via REDIS_URL
+        self.shared_cache_ttls = {
+            '/option-chain': 2,
+            '/marketStatus': 15,
+            '/live-analysis/vix': 60,
+            '/equity-stockIndices': 15
+        }
         
         # Indian market indices
         self.indices = ['NIFTY', 'BANKNIFTY', 'FINNIFTY', 'MIDCPNIFTY', 'NIFTYIT', 'NIFTYPHARMA']
         
         # Indian Standard Time
-        self.ist = pytz.timezone('Asia/Kolkata')
+        self.ist = IST
         
         # Indian market timings (IST)
         self.market_open_time = "09:15"
         self.market_close_time = "15:30"
         self.pre_market_start = "09:00"
         self.pre_market_end = "09:15"
+        
+        # Same timings as minutes since midnight for comparisons
+        self.market_open_min = hm(self.market_open_time)
+        self.market_close_min = hm(self.market_close_time)
+        self.pre_market_start_min = hm(self.pre_market_start)
+        self.pre_market_end_min = hm(self.pre_market_end)
+        
+        # Weekday session by minute: names[i] applies from starts[i] onwards
+        self._session_starts = [0, self.pre_market_start_min, self.market_open_min, self.market_close_min + 1]
+        self._session_names = ("PRE_MARKET_CLOSED", "PRE_MARKET", "MARKET_HOURS", "POST_MARKET_CLOSED")
+        
+        # Background poller state: key -> (monotonic fetch time, payload)
+        self._live: Dict[Any, Tuple[float, Any]] = {}
+        self._poll_stop = threading.Event()
+        self._poll_stop.set()
+        self._poll_thread: Optional[threading.Thread] = None
+        self._poll_pool: Optional[ThreadPoolExecutor] = None
+        self.poll_symbols: List[str] = ['NIFTY', 'BANKNIFTY', 'FINNIFTY', 'MIDCPNIFTY']
+        self.poll_interval = 2.0  # Seconds between refresh sweeps
+        self.off_hours_poll_interval = 300.0  # Sweep interval while the market is closed
+        self.market_status_ttl = 30.0  # Seconds market status is reused
+        self.vix_ttl = 10.0  # Seconds VIX data is reused
+        self.option_chain_ttl = 1.5  # Seconds an option chain is reused
+        self.fo_list_ttl = 15.0  # Seconds the F&O movers list is reused
+        self._fo_lock = threading.Lock()
     
     def get_current_ist_time(self) -> datetime:
         """Get current time in IST"""
@@ -54,31 +116,91 @@ class NSEData:
         if current_time.weekday() >= 5:  # Saturday or Sunday
             return False
         
-        current_time_str = current_time.strftime("%H:%M")
-        return self.market_open_time <= current_time_str <= self.market_close_time
+        minute = current_time.hour * 60 + current_time.minute
+        return self.market_open_min <= minute <= self.market_close_min
+    
+    def _prewarm(self) -> None:
+        """Load the NSE home page so API calls carry session cookies"""
+        with self._prewarm_lock:
+            # Another thread may have warmed up, or recently failed to, while we waited
+            if self._cookies_ready or time.monotonic() < self._prewarm_retry_at:
+                return
+            try:
+                response = self.session.get("https://www.nseindia.com/", timeout=10)
+                response.raise_for_status()
+                self._cookies_ready = True
+            except Exception as e:
+                self._prewarm_retry_at = time.monotonic() + self.prewarm_retry_delay
+                trade_logger.log_warning(f"NSE cookie prewarm failed: {str(e)}")
     
     def _get_nse_data(self, endpoint: str) -> Optional[Dict]:
+        """Fetch data from NSE India API, through the shared cache when enabled"""
+        ttl = self._shared_cache_ttl(endpoint) if shared_cache.enabled else 0
+        if not ttl:
+            return self._fetch_nse_data(endpoint)
+        
+        cached = shared_cache.get_json(endpoint)
+        if cached is not None:
+            return cached
+        
+        # Single-flight: one process refreshes, the others briefly wait for it
+        locked = shared_cache.acquire(endpoint, self.request_timeout)
+        if not locked:
+            for _ in range(5):
+                time.sleep(0.1)
+                cached = shared_cache.get_json(endpoint)
+                if cached is not None:
+                    return cached
+        
+        try:
+            data = self._fetch_nse_data(endpoint)
+            if data is not None:
+                shared_cache.setex_json(endpoint, ttl, data)
+            return data
+        finally:
+            if locked:
+                shared_cache.release(endpoint)
+    
+    def _shared_cache_ttl(self, endpoint: str) -> float:
+        """Cross-process cache lifetime for an endpoint, 0 to skip caching"""
+        for prefix, ttl in self.shared_cache_ttls.items():
+            if endpoint.startswith(prefix):
+                return ttl
+        return 0
+    
+    def _fetch_nse_data(self, endpoint: str) -> Optional[Dict]:
         """Fetch data from NSE India API"""
+        current_time = self.get_current_ist_time()
+        now_s = current_time.strftime(IST_FORMAT)
+        
         try:
+            if not self._cookies_ready:
+                self._prewarm()
+            
             url = f"{self.nse_base_url}{endpoint}"
-            response = self.session.get(url, timeout=15)
+            response = self.session.get(url, timeout=self.request_timeout)
             response.raise_for_status()
             
             # Log successful API call with IST timestamp
-            current_time = self.get_current_ist_time()
-            trade_logger.log_info(f"NSE API call successful at {current_time.strftime('%Y-%m-%d %H:%M:%S IST')}: {endpoint}")
+            if trade_logger.is_info_enabled():
+                trade_logger.log_info("NSE API call successful at %s: %s", now_s, endpoint)
             
-            return response.json()
+            return orjson.loads(response.content) if orjson else response.json()
         except Exception as e:
-            current_time = self.get_current_ist_time()
-            trade_logger.log_error(f"NSE API error at {current_time.strftime('%Y-%m-%d %H:%M:%S IST')} for {endpoint}: {str(e)}")
+            # NSE answers 401/403 once its cookies lapse; prewarm again on the next call
+            if isinstance(e, requests.HTTPError) and e.response is not None \
+                    and e.response.status_code in (401, 403):
+                self._cookies_ready = False
+            trade_logger.log_error(f"NSE API error at {now_s} for {endpoint}: {str(e)}")
             return None
     
     def get_market_status(self) -> Dict[str, Any]:
         """Get current Indian market status with IST timing"""
+        current_time = self.get_current_ist_time()
+        now_s = current_time.strftime(IST_FORMAT)
+        
         try:
-            current_time = self.get_current_ist_time()
-            data = self._get_nse_data("/marketStatus")
+            data = self._polled_nse_data('market_status', "/marketStatus", self.market_status_ttl)
             
             if data:
                 market_open = any(market.get("marketStatus") == "Open" 
@@ -86,18 +208,17 @@ class NSEData:
                 
                 return {
                     "market_open": market_open,
-                    "current_time_ist": current_time.strftime('%Y-%m-%d %H:%M:%S IST'),
+                    "current_time_ist": now_s,
                     "is_trading_day": current_time.weekday() < 5,
                     "market_session": self._get_market_session_name(current_time),
                     "market_data": data
                 }
         except Exception as e:
-            current_time = self.get_current_ist_time()
-            trade_logger.log_error(f"Market status error at {current_time.strftime('%Y-%m-%d %H:%M:%S IST')}: {str(e)}")
+            trade_logger.log_error(f"Market status error at {now_s}: {str(e)}")
         
         return {
             "market_open": False, 
-            "current_time_ist": self.get_current_ist_time().strftime('%Y-%m-%d %H:%M:%S IST'),
+            "current_time_ist": now_s,
             "is_trading_day": False,
             "market_session": "CLOSED",
             "market_data": {}
@@ -108,19 +229,14 @@ class NSEData:
         if current_time.weekday() >= 5:  # Weekend
             return "WEEKEND_CLOSED"
         
-        time_str = current_time.strftime("%H:%M")
-        
-        if self.pre_market_start <= time_str < self.pre_market_end:
-            return "PRE_MARKET"
-        elif self.market_open_time <= time_str <= self.market_close_time:
-            return "MARKET_HOURS"
-        elif time_str > self.market_close_time:
-            return "POST_MARKET_CLOSED"
-        else:
-            return "PRE_MARKET_CLOSED"
+        minute = current_time.hour * 60 + current_time.minute
+        return self._session_names[bisect_right(self._session_starts, minute) - 1]
     
     def get_index_data(self, index_name: str = "NIFTY 50") -> Dict[str, Any]:
         """Get Indian index data with IST timestamps"""
+        current_time = self.get_current_ist_time()
+        now_s = current_time.strftime(IST_FORMAT)
+        
         try:
             if index_name not in self.indian_indices:
                 trade_logger.log_warning(f"Index {index_name} not in supported Indian indices")
@@ -129,21 +245,30 @@ class NSEData:
             data = self._get_nse_data(f"/live-analysis/gainers-losers/{index_name.replace(' ', '%20')}")
             
             if data:
-                current_time = self.get_current_ist_time()
-                data["timestamp_ist"] = current_time.strftime('%Y-%m-%d %H:%M:%S IST')
+                data["timestamp_ist"] = now_s
                 data["market_session"] = self._get_market_session_name(current_time)
                 
             return data
         except Exception as e:
-            current_time = self.get_current_ist_time()
-            trade_logger.log_error(f"Index data error for {index_name} at {current_time.strftime('%Y-%m-%d %H:%M:%S IST')}: {str(e)}")
+            trade_logger.log_error(f"Index data error for {index_name} at {now_s}: {str(e)}")
             return {}
     
-    def get_option_chain(self, symbol: str) -> Optional[Dict]:
-        """Get option chain data for Indian stocks/indices with IST timestamps"""
+    def get_option_chain(self, symbol: str, force: bool = False) -> Optional[Dict]:
+        """Get option chain data for Indian stocks/indices with IST timestamps
+        
+        Chains newer than ``option_chain_ttl`` seconds are served from memory;
+        pass ``force=True`` to always fetch.
+        """
+        key = ('option_chain', symbol.upper())
+        if not force:
+            cached = self.get_live(key, self.option_chain_ttl)
+            if cached is not None:
+                return cached
+        
+        current_time = self.get_current_ist_time()
+        now_s = current_time.strftime(IST_FORMAT)
+        
         try:
-            current_time = self.get_current_ist_time()
-            
             # Determine correct endpoint for Indian markets
             if symbol.upper() in ['NIFTY', 'BANKNIFTY']:
                 endpoint = f"/option-chain-indices?symbol={symbol.upper()}"
@@ -153,105 +278,195 @@ class NSEData:
             data = self._get_nse_data(endpoint)
             
             if data:
-                data["timestamp_ist"] = current_time.strftime('%Y-%m-%d %H:%M:%S IST')
+                data["timestamp_ist"] = now_s
                 data["market_session"] = self._get_market_session_name(current_time)
                 data["symbol"] = symbol.upper()
+                self._live[key] = (time.monotonic(), data)
                 
             return data
         except Exception as e:
-            current_time = self.get_current_ist_time()
-            trade_logger.log_error(f"Option chain error for {symbol} at {current_time.strftime('%Y-%m-%d %H:%M:%S IST')}: {str(e)}")
+            trade_logger.log_error(f"Option chain error for {symbol} at {now_s}: {str(e)}")
             return None
     
-    def get_expiry_dates(self, symbol: str) -> List[str]:
+    def invalidate(self, symbol: str) -> None:
+        """Drop the cached option chain for a symbol"""
+        self._live.pop(('option_chain', symbol.upper()), None)
+    
+    def get_expiry_dates(self, symbol: str, option_data: Optional[Dict] = None) -> List[str]:
         """Get expiry dates for options with IST timezone consideration"""
+        current_time = self.get_current_ist_time()
+        now_s = current_time.strftime(IST_FORMAT)
+        
         try:
-            current_time = self.get_current_ist_time()
-            option_data = self.get_option_chain(symbol)
+            if option_data is None:
+                option_data = self.get_option_chain(symbol)
             if option_data and "records" in option_data:
                 expiry_dates = option_data["records"].get("expiryDates", [])
                 
                 # Log retrieval with IST timestamp
-                trade_logger.log_info(f"Retrieved {len(expiry_dates)} expiry dates for {symbol} at {current_time.strftime('%Y-%m-%d %H:%M:%S IST')}")
+                if trade_logger.is_info_enabled():
+                    trade_logger.log_info("Retrieved %d expiry dates for %s at %s", len(expiry_dates), symbol, now_s)
                 return expiry_dates
         except Exception as e:
-            current_time = self.get_current_ist_time()
-            trade_logger.log_error(f"Expiry dates error for {symbol} at {current_time.strftime('%Y-%m-%d %H:%M:%S IST')}: {str(e)}")
+            trade_logger.log_error(f"Expiry dates error for {symbol} at {now_s}: {str(e)}")
         
         return []
     
-    def get_strike_prices(self, symbol: str, expiry: str) -> List[float]:
+    def get_strike_prices(self, symbol: str, expiry: str, option_data: Optional[Dict] = None) -> List[float]:
         """Get strike prices for a given expiry with IST timezone consideration"""
+        current_time = self.get_current_ist_time()
+        now_s = current_time.strftime(IST_FORMAT)
+        
         try:
-            current_time = self.get_current_ist_time()
-            option_data = self.get_option_chain(symbol)
+            if option_data is None:
+                option_data = self.get_option_chain(symbol)
             if option_data and "records" in option_data:
                 data = option_data["records"].get("data", [])
-                strikes = set()
-                
-                for item in data:
-                    if item.get("expiryDate") == expiry:
-                        strikes.add(item.get("strikePrice", 0))
-                
-                strike_list = sorted(list(strikes))
-                trade_logger.log_info(f"Retrieved {len(strike_list)} strike prices for {symbol} {expiry} at {current_time.strftime('%Y-%m-%d %H:%M:%S IST')}")
+                strikes = np.fromiter(
+                    (float(item.get("strikePrice") or 0) for item in data if item.get("expiryDate") == expiry),
+                    dtype=np.float64
+                )
+                strike_list = np.unique(strikes).tolist()
+                if trade_logger.is_info_enabled():
+                    trade_logger.log_info("Retrieved %d strike prices for %s %s at %s", len(strike_list), symbol, expiry, now_s)
                 return strike_list
                 
         except Exception as e:
-            current_time = self.get_current_ist_time()
-            trade_logger.log_error(f"Strike prices error for {symbol} at {current_time.strftime('%Y-%m-%d %H:%M:%S IST')}: {str(e)}")
+            trade_logger.log_error(f"Strike prices error for {symbol} at {now_s}: {str(e)}")
         
         return []
     
     def get_vix_data(self) -> Optional[Dict]:
         """Get VIX data with IST timestamps (India VIX)"""
+        current_time = self.get_current_ist_time()
+        now_s = current_time.strftime(IST_FORMAT)
+        
         try:
-            current_time = self.get_current_ist_time()
-            data = self._get_nse_data("/live-analysis/vix")
+            data = self._polled_nse_data('vix', "/live-analysis/vix", self.vix_ttl)
             
             if data:
-                data["timestamp_ist"] = current_time.strftime('%Y-%m-%d %H:%M:%S IST')
+                # Copy so the shared polled payload is not stamped in place
+                data = dict(data)
+                data["timestamp_ist"] = now_s
                 data["market_session"] = self._get_market_session_name(current_time)
                 
             return data
         except Exception as e:
-            current_time = self.get_current_ist_time()
-            trade_logger.log_error(f"VIX data error at {current_time.strftime('%Y-%m-%d %H:%M:%S IST')}: {str(e)}")
+            trade_logger.log_error(f"VIX data error at {now_s}: {str(e)}")
             return None
     
+    def _fetch_fo_list(self) -> Optional[List]:
+        """F&O securities list shared by gainers and losers (short TTL)"""
+        with self._fo_lock:
+            rows = self.get_live('fo_list', self.fo_list_ttl)
+            if rows is None:
+                data = self._get_nse_data("/equity-stockIndices?index=SECURITIES%20IN%20F%26O")
+                if data and "data" in data:
+                    rows = data["data"]
+                    self._live['fo_list'] = (time.monotonic(), rows)
+            return rows
+    
     def get_top_gainers_losers(self, category: str = "gainers") -> Optional[List]:
         """Get top gainers or losers with IST timestamps"""
+        current_time = self.get_current_ist_time()
+        now_s = current_time.strftime(IST_FORMAT)
+        
         try:
-            current_time = self.get_current_ist_time()
-            
             if category.lower() not in ["gainers", "losers"]:
-                trade_logger.log_warning(f"Invalid category '{category}' requested at {current_time.strftime('%Y-%m-%d %H:%M:%S IST')}")
+                trade_logger.log_warning(f"Invalid category '{category}' requested at {now_s}")
                 return None
             
-            endpoint = f"/equity-stockIndices?index=SECURITIES%20IN%20F%26O"
-            data = self._get_nse_data(endpoint)
+            rows = self._fetch_fo_list()
             
-            if data:
-                # Add IST timestamp to the data
-                data["timestamp_ist"] = current_time.strftime('%Y-%m-%d %H:%M:%S IST')
-                data["market_session"] = self._get_market_session_name(current_time)
-                
-                if "data" in data:
-                    sorted_data = sorted(
-                        data["data"], 
-                        key=lambda x: x.get("pChange", 0), 
-                        reverse=(category.lower() == "gainers")
-                    )
-                    top_10 = sorted_data[:10]  # Top 10
-                    trade_logger.log_info(f"Retrieved top 10 {category} at {current_time.strftime('%Y-%m-%d %H:%M:%S IST')}")
-                    return top_10
+            if rows is not None:
+                select = heapq.nlargest if category.lower() == "gainers" else heapq.nsmallest
+                top_10 = select(10, rows, key=lambda x: x.get("pChange", 0))
+                trade_logger.log_info(f"Retrieved top 10 {category} at {now_s}")
+                return top_10
                 
         except Exception as e:
-            current_time = self.get_current_ist_time()
-            trade_logger.log_error(f"Top {category} error at {current_time.strftime('%Y-%m-%d %H:%M:%S IST')}: {str(e)}")
+            trade_logger.log_error(f"Top {category} error at {now_s}: {str(e)}")
         
         return []
     
+    def start_polling(self, symbols: Optional[List[str]] = None, interval: Optional[float] = None) -> None:
+        """Start background refresh of market status, VIX and option chains"""
+        if not self._poll_stop.is_set():
+            trade_logger.log_warning("NSE poller is already running")
+            return
+        
+        if symbols:
+            self.poll_symbols = [s.upper() for s in symbols]
+        if interval:
+            self.poll_interval = interval
+        
+        self._poll_stop.clear()
+        self._poll_pool = ThreadPoolExecutor(max_workers=len(self.poll_symbols) + 2,
+                                             thread_name_prefix='nse-poll')
+        self._poll_thread = threading.Thread(target=self._poll_loop, name='nse-poller', daemon=True)
+        self._poll_thread.start()
+        
+        trade_logger.log_info(f"NSE poller started for {', '.join(self.poll_symbols)}")
+    
+    def stop_polling(self) -> None:
+        """Stop the background refresh"""
+        if self._poll_stop.is_set():
+            return
+        
+        self._poll_stop.set()
+        if self._poll_thread and self._poll_thread.is_alive():
+            self._poll_thread.join(timeout=5)
+        if self._poll_pool:
+            self._poll_pool.shutdown(wait=False)
+            self._poll_pool = None
+        
+        trade_logger.log_info("NSE poller stopped")
+    
+    def _poll_loop(self) -> None:
+        """Refresh every tracked endpoint concurrently, once per interval"""
+        jobs = [('market_status', lambda: self._get_nse_data("/marketStatus")),
+                ('vix', lambda: self._get_nse_data("/live-analysis/vix"))]
+        jobs += [(('option_chain', symbol), lambda symbol=symbol: self.get_option_chain(symbol, force=True))
+                 for symbol in self.poll_symbols]
+        
+        while not self._poll_stop.is_set():
+            started = time.monotonic()
+            try:
+                futures = [(key, self._poll_pool.submit(fetch)) for key, fetch in jobs]
+                for key, future in futures:
+                    payload = future.result()
+                    if payload:
+                        self._live[key] = (time.monotonic(), payload)
+            except Exception as e:
+                trade_logger.log_error(f"NSE poller error: {str(e)}")
+            
+            # Back off while the market is closed so NSE isn't hit around the clock
+            interval = self.poll_interval if self.is_market_open_now() else self.off_hours_poll_interval
+            self._poll_stop.wait(max(0.0, interval - (time.monotonic() - started)))
+    
+    def _polled_nse_data(self, key: Any, endpoint: str, max_age: float) -> Optional[Dict]:
+        """Polled payload for key when fresh, otherwise fetched now and stored"""
+        data = self.get_live(key, max_age)
+        if data is None:
+            data = self._get_nse_data(endpoint)
+            if data:
+                self._live[key] = (time.monotonic(), data)
+        return data
+    
+    def get_live(self, key: Any, max_age: float) -> Optional[Any]:
+        """Return the polled payload for key if newer than max_age seconds"""
+        entry = self._live.get(key)
+        if entry and time.monotonic() - entry[0] <= max_age:
+            return entry[1]
+        return None
+    
+    def latest_option_chain(self, symbol: str, max_age: float = 5.0) -> Optional[Dict]:
+        """Option chain from the poller when fresh, otherwise fetched now"""
+        data = self.get_live(('option_chain', symbol.upper()), max_age)
+        if data is None:
+            data = self.get_option_chain(symbol)
+        return data
+    
     def get_live_price_kite(self, symbol: str) -> Optional[float]:
         """Get live price using Kite API"""
         try:
@@ -267,31 +482,52 @@ class NSEData:
         
         return None
     
-    def get_historical_data_kite(self, instrument_token: str, days: int = 30) -> Optional[pd.DataFrame]:
-        """Get historical data using Kite API"""
+    def get_historical_data_kite(self, instrument_token: str, days: int = 30,
+                                 as_frame: bool = False) -> Optional[Any]:
+        """Get historical data using Kite API
+        
+        Returns a dict of column arrays (date, open, high, low, close,
+        volume); pass ``as_frame=True`` for a pandas DataFrame instead.
+        """
         try:
-            to_date = datetime.now().strftime("%Y-%m-%d")
-            from_date = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+            now = datetime.now()
+            to_date = now.strftime("%Y-%m-%d")
+            from_date = (now - timedelta(days=days)).strftime("%Y-%m-%d")
             
             data = kite_api.get_historical_data(instrument_token, from_date, to_date, "day")
             
             if data:
-                df = pd.DataFrame(data, columns=['date', 'open', 'high', 'low', 'close', 'volume'])
-                df['date'] = pd.to_datetime(df['date'])
-                return df
+                if as_frame:
+                    df = pd.DataFrame(data, columns=['date', 'open', 'high', 'low', 'close', 'volume'])
+                    df['date'] = pd.to_datetime(df['date'])
+                    return df
+                
+                count = len(data)
+                columns = {'date': np.array([candle[0] for candle in data])}
+                for i, name in enumerate(('open', 'high', 'low', 'close', 'volume'), start=1):
+                    columns[name] = np.fromiter((candle[i] for candle in data), dtype=np.float64, count=count)
+                return columns
                 
         except Exception as e:
             trade_logger.log_error(f"Historical data error: {str(e)}")
         
         return None
     
-    def calculate_volatility(self, symbol: str, days: int = 20) -> Optional[float]:
-        """Calculate historical volatility"""
+    def calculate_volatility(self, symbol: str, days: int = 20,
+                             instrument_token: Optional[str] = None) -> Optional[float]:
+        """Calculate annualized historical volatility from daily closes"""
         try:
-            # This would need instrument token - simplified for now
             trade_logger.log_info(f"Calculating volatility for {symbol} over {days} days")
-            # Implementation would require instrument token lookup
-            return None
+            if instrument_token is None:
+                # Symbol -> instrument token lookup is not available yet
+                return None
+            
+            candles = self.get_historical_data_kite(instrument_token, days)
+            if not candles or len(candles['close']) < 2:
+                return None
+            
+            returns = np.diff(np.log(candles['close']))
+            return float(np.std(returns) * np.sqrt(252))
             
         except Exception as e:
             trade_logger.log_error(f"Volatility calculation error: {str(e)}")
@@ -299,42 +535,47 @@ class NSEData:
     
     def get_market_summary(self) -> Dict[str, Any]:
         """Get comprehensive market summary"""
-        summary = {
-            "timestamp": datetime.now().isoformat(),
-            "market_status": self.get_market_status(),
-            "indices": {},
-            "vix": self.get_vix_data(),
-            "top_gainers": self.get_top_gainers_losers("gainers"),
-            "top_losers": self.get_top_gainers_losers("losers")
-        }
+        timestamp = datetime.now().isoformat()
         
-        # Get data for all major indices
-        for index in self.indices:
-            summary["indices"][index] = self.get_index_data(index)
-        
-        return summary
+        # Fire every endpoint at once; the pooled session reuses connections
+        with ThreadPoolExecutor(max_workers=len(self.indices) + 4, thread_name_prefix='nse-summary') as pool:
+            market_status = pool.submit(self.get_market_status)
+            vix = pool.submit(self.get_vix_data)
+            gainers = pool.submit(self.get_top_gainers_losers, "gainers")
+            losers = pool.submit(self.get_top_gainers_losers, "losers")
+            indices = {index: pool.submit(self.get_index_data, index) for index in self.indices}
+            
+            return {
+                "timestamp": timestamp,
+                "market_status": market_status.result(),
+                "indices": {index: future.result() for index, future in indices.items()},
+                "vix": vix.result(),
+                "top_gainers": gainers.result(),
+                "top_losers": losers.result()
+            }
 
 
 # Global NSE data instance
 nse_data = NSEData()
 
 # Lightweight snapshot types for strategy usage
-from dataclasses import dataclass
-from typing import NamedTuple
+from dataclasses import dataclass, field
 
-@dataclass
-class StrikeSnap:
-    strike: int
-    side: str  # 'CE' or 'PE'
-    oi: float
-    vol: float
+_EMPTY = np.zeros(0)
 
-@dataclass
+@dataclass(slots=True)
 class Snapshot:
+    """Option chain around ATM as parallel per-strike arrays"""
     symbol: str
     fut_ltp: float
     atm: int
-    strikes: list
+    step: int = 50  # Strike spacing for the symbol
+    strike: np.ndarray = field(default_factory=lambda: _EMPTY)
+    ce_oi: np.ndarray = field(default_factory=lambda: _EMPTY)
+    pe_oi: np.ndarray = field(default_factory=lambda: _EMPTY)
+    ce_vol: np.ndarray = field(default_factory=lambda: _EMPTY)
+    pe_vol: np.ndarray = field(default_factory=lambda: _EMPTY)
+    dist: np.ndarray = field(default_factory=lambda: _EMPTY)  # |strike - atm|
 
 def _nearest_step(price: float, step: int) -> int:
     try:
@@ -346,7 +587,7 @@ def fetch_snapshot(symbol: str, band_points: int = 5) -> Snapshot:
     """Build a minimal snapshot around ATM from NSE option chain.
     band_points counts 50/100 steps around ATM for CE/PE aggregation.
     """
-    data = nse_data.get_option_chain(symbol)
+    data = nse_data.latest_option_chain(symbol)
     # Underlying
     fut_ltp = 0.0
     try:
@@ -360,24 +601,32 @@ def fetch_snapshot(symbol: str, band_points: int = 5) -> Snapshot:
     elif symbol.upper() == 'MIDCPNIFTY':
         step = 25
     atm = _nearest_step(fut_ltp, step) if fut_ltp else 0
-    snaps = []
+    snap = Snapshot(symbol=symbol.upper(), fut_ltp=fut_ltp, atm=atm, step=step)
     try:
         records = (data or {}).get('records', {})
         rows = records.get('data', [])
         # Filter same expiry as first row
         target_exp = rows[0].get('expiryDate') if rows else None
-        for row in rows:
-            if target_exp and row.get('expiryDate') != target_exp:
-                continue
-            sp = int(row.get('strikePrice', 0) or 0)
-            if atm and abs(sp - atm) > band_points*step:
-                continue
+        if target_exp:
+            rows = [row for row in rows if row.get('expiryDate') == target_exp]
+        if not rows:
+            return snap
+        strike = np.fromiter((row.get('strikePrice') or 0 for row in rows), dtype=np.int64, count=len(rows))
+        cols = np.zeros((4, len(rows)))
+        for i, row in enumerate(rows):
             ce = row.get('CE') or {}
             pe = row.get('PE') or {}
-            if ce:
-                snaps.append(StrikeSnap(sp, 'CE', float(ce.get('openInterest') or 0), float(ce.get('totalTradedVolume') or 0)))
-            if pe:
-                snaps.append(StrikeSnap(sp, 'PE', float(pe.get('openInterest') or 0), float(pe.get('totalTradedVolume') or 0)))
+            cols[0, i] = ce.get('openInterest') or 0
+            cols[1, i] = pe.get('openInterest') or 0
+            cols[2, i] = ce.get('totalTradedVolume') or 0
+            cols[3, i] = pe.get('totalTradedVolume') or 0
+        dist = np.abs(strike - atm)
+        if atm:
+            keep = dist <= band_points*step
+            strike, dist, cols = strike[keep], dist[keep], cols[:, keep]
+        snap.strike = strike
+        snap.dist = dist
+        snap.ce_oi, snap.pe_oi, snap.ce_vol, snap.pe_vol = cols
     except Exception:
         pass
-    return Snapshot(symbol=symbol.upper(), fut_ltp=fut_ltp, atm=atm, strikes=snaps)
+    return snap
@@ -1,4 +1,9 @@
+import asyncio
 from strategy_expiry import run_once
-if __name__=='__main__':
+
+async def main():
     for s in ('NIFTY','BANKNIFTY','FINNIFTY','MIDCPNIFTY'):
-        run_once(s)
+        await run_once(s)
+
+if __name__=='__main__':
+    asyncio.run(main())
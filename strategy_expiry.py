@@ -1,44 +1,70 @@
-from datetime import datetime, timedelta
-from config import AWARENESS, ENTRY_POLICY, TIME_WINDOWS, MARKET
+import asyncio, time
+from datetime import datetime
+import numpy as np
+from config import AWARENESS, ENTRY_POLICY, TIME_WINDOWS_MIN, MARKET_MIN, NO_NEW_ENTRY_MIN
 from indicator import compute_1m, compute_3m
-from nse_data import fetch_snapshot
+from nse_data import fetch_snapshot, IST
 from kite_api import place_market
 from telegram_bot import send_entry, send_warn
 from trade_logger import log
 from lot_manager import decide_lots
 from learning_engine import log_features
 from lot_manager import can_open, register_entry
-from config import OPTION_CONFIRM_MIN, OPTION_CONFIRM_MIN_HIGH_VIX, VIX_BANDS, EXIT_PARTIAL_PCT
-
-def _band(strikes, atm, band, side):
-    return [s for s in strikes if s.side==side and abs(s.strike-atm)<=band*50]
-
-def pcr(snapshot, band=5):
-    ce=sum(s.oi for s in _band(snapshot.strikes, snapshot.atm, band, 'CE'))
-    pe=sum(s.oi for s in _band(snapshot.strikes, snapshot.atm, band, 'PE'))
-    return (pe/ce) if ce>0 else 0.0
-
-def skew(snapshot, band=2):
-    ce=sum(s.oi for s in _band(snapshot.strikes, snapshot.atm, band, 'CE'))
-    pe=sum(s.oi for s in _band(snapshot.strikes, snapshot.atm, band, 'PE'))
-    return (ce/pe if pe>0 else 0.0, pe/ce if ce>0 else 0.0)
-
-def choose_strike(fut_ltp:float, direction:str, now:datetime)->int:
-    hhmm=now.strftime('%H:%M')
-    round50=lambda x:int(round(x/50.0)*50)
-    ceil50=lambda x:int(((x+49)//50)*50)
-    floor50=lambda x:int((x//50)*50)
+from config import OPTION_CONFIRM_MIN, OPTION_CONFIRM_MIN_HIGH_VIX, VIX_BANDS, EXIT_PARTIAL_PCT, STRIKE_STEP
+
+_GATE_BANDS=np.array([1,2,3,6])
+
+def _band_oi(snapshot, bands):
+    # (len(bands), 2) CE/PE OI sums per band (in strike steps) from one masked product over the chain
+    within=(snapshot.dist<=bands[:,None]*snapshot.step).astype(np.float64)
+    return within@np.stack((snapshot.ce_oi, snapshot.pe_oi), axis=1)
+
+_MORNING=TIME_WINDOWS_MIN['morning']; _MIDDAY=TIME_WINDOWS_MIN['midday']; _AFTERNOON=TIME_WINDOWS_MIN['afternoon']
+_FORCE_EXIT_MIN=MARKET_MIN['force_exit']
+
+def _round_step(x:float, step:int=50)->int:
+    return ((int(x)+step//2)//step)*step
+
+def _floor_step(x:float, step:int=50)->int:
+    return int(x//step)*step
+
+def _ceil_step(x:float, step:int=50)->int:
+    return int(-(-x//step))*step
+
+DIR_SIGN={'BULL':1,'BEAR':-1}
+SIDE_OF_SIGN={1:'CE',-1:'PE'}
+# Rounding toward OTM (away) and toward ITM (back) for each direction sign
+_OTM_ROUND={1:_ceil_step,-1:_floor_step}
+_ITM_ROUND={1:_floor_step,-1:_ceil_step}
+
+def choose_strike(fut_ltp:float, direction:str, now:datetime, step:int=50)->int:
+    m=now.hour*60+now.minute
+    sign=DIR_SIGN[direction]
     # Dynamic: early go further OTM; midday ATM; afternoon closer ITM bias on follow-through
-    if TIME_WINDOWS['morning'][0]<=hhmm<TIME_WINDOWS['morning'][1]:
-        base = ceil50(fut_ltp) if direction=='BULL' else floor50(fut_ltp)
-        return base + (100 if direction=='BULL' else -100)
-    if TIME_WINDOWS['midday'][0]<=hhmm<TIME_WINDOWS['midday'][1]:
-        return round50(fut_ltp)
-    if TIME_WINDOWS['afternoon'][0]<=hhmm<TIME_WINDOWS['afternoon'][1]:
-        base = floor50(fut_ltp) if direction=='BULL' else ceil50(fut_ltp)
-        return base
+    if _MORNING[0]<=m<_MORNING[1]:
+        return _OTM_ROUND[sign](fut_ltp, step) + sign*2*step
+    if _MIDDAY[0]<=m<_MIDDAY[1]:
+        return _round_step(fut_ltp, step)
+    if _AFTERNOON[0]<=m<_AFTERNOON[1]:
+        return _ITM_ROUND[sign](fut_ltp, step)
     return -1
 
+# Short-lived snapshots shared by every gate in a tick; dropped on entry
+_SNAP_TTL=1.5
+_snap_cache={}
+
+def _cached_snapshot(symbol:str, band:int):
+    key=(symbol, band); hit=_snap_cache.get(key)
+    if hit and time.monotonic()-hit[0]<_SNAP_TTL:
+        return hit[1]
+    snap=fetch_snapshot(symbol, band)
+    _snap_cache[key]=(time.monotonic(), snap)
+    return snap
+
+def invalidate_snapshots(symbol:str):
+    for key in [k for k in _snap_cache if k[0]==symbol]:
+        _snap_cache.pop(key, None)
+
 # Placeholder for VIX and OI/Vol gates
 def get_vix():
     return 15.0
@@ -48,18 +74,16 @@ def option_confirm_score(symbol:str)->float:
     # TODO: Implement with real option snapshot features
     return 0.8
 
-def oi_volume_gate(symbol:str)->bool:
+def oi_volume_gate(symbol:str, snap=None)->bool:
     try:
-        snap=fetch_snapshot(symbol, 6)
+        if snap is None:
+            snap=_cached_snapshot(symbol, 6)
         if not snap or not snap.atm:
             return False
-        x_pcr=pcr(snap, 6)
-        ce_skew, pe_skew = skew(snap, 2)
+        (near_ce,near_pe),(sk_ce,sk_pe),(mid_ce,mid_pe),(all_ce,all_pe)=_band_oi(snap, _GATE_BANDS).tolist()
+        x_pcr=(all_pe/all_ce) if all_ce>0 else 0.0
+        ce_skew=sk_ce/sk_pe if sk_pe>0 else 0.0; pe_skew=sk_pe/sk_ce if sk_ce>0 else 0.0
         # OI velocity proxy: compare near-band OI vs mid-band OI
-        near_ce=sum(s.oi for s in _band(snap.strikes,snap.atm,1,'CE'))
-        near_pe=sum(s.oi for s in _band(snap.strikes,snap.atm,1,'PE'))
-        mid_ce=sum(s.oi for s in _band(snap.strikes,snap.atm,3,'CE'))
-        mid_pe=sum(s.oi for s in _band(snap.strikes,snap.atm,3,'PE'))
         vel_ce = (near_ce/mid_ce) if mid_ce>0 else 0.0
         vel_pe = (near_pe/mid_pe) if mid_pe>0 else 0.0
         # Gates
@@ -74,25 +98,28 @@ def oi_volume_gate(symbol:str)->bool:
 # Hybrid 1m/3m execution controller (simplified)
 _last_entry = {}
 
-def run_once(symbol='NIFTY'):
-    now=datetime.utcnow()+timedelta(hours=5,minutes=30)
-    hhmm=now.strftime('%H:%M')
-    if hhmm>=MARKET['force_exit']:
+async def run_once(symbol='NIFTY'):
+    now=datetime.now(IST)
+    m=now.hour*60+now.minute
+    if m>=_FORCE_EXIT_MIN:
         send_warn('After force-exit window – manage only'); return
-    snap=fetch_snapshot(symbol, 5)
-    f1=compute_1m(symbol); f3=compute_3m(symbol)
+    # Snapshot and both timeframes are independent; wait on the slowest, not the sum
+    snap,f1,f3=await asyncio.gather(
+        asyncio.to_thread(_cached_snapshot, symbol, 6),
+        asyncio.to_thread(compute_1m, symbol),
+        asyncio.to_thread(compute_3m, symbol))
 
     # Futures mandatory confirm
     direction='BULL' if f3.price_above_200wma else 'BEAR'
     if f3.lr_slope_3m < AWARENESS['lr_slope_min']:
         send_warn(f"{symbol} gate: lr slope {f3.lr_slope_3m:.2f} < {AWARENESS['lr_slope_min']}"); return
 
-    # OI/Volume confirm
-    if not oi_volume_gate(symbol):
+    # OI/Volume confirm (band 6 snapshot already covers every gate band)
+    if not oi_volume_gate(symbol, snap):
         send_warn(f"{symbol} gate: OI/Volume not supportive"); return
 
-    strike=choose_strike(snap.fut_ltp, direction, now)
-    if strike<0 or hhmm>='14:00':
+    strike=choose_strike(snap.fut_ltp, direction, now, STRIKE_STEP.get(symbol, 50))
+    if strike<0 or m>=NO_NEW_ENTRY_MIN:
         send_warn('No new entries after 14:00'); return
 
     # Double confirmation (options weighted)
@@ -102,7 +129,7 @@ def run_once(symbol='NIFTY'):
     if opt_score < thresh:
         send_warn(f"{symbol} gate: option confirm {opt_score:.2f} < {thresh:.2f}"); return
 
-    side='CE' if direction=='BULL' else 'PE'
+    side=SIDE_OF_SIGN[DIR_SIGN[direction]]
     lots=decide_lots(symbol, 0.95)
 
     # Exposure cap enforcement
@@ -116,6 +143,7 @@ def run_once(symbol='NIFTY'):
 
     res=place_market(f'{symbol}{strike}{side}', lots, 'BUY')
     register_entry(symbol, exposure)
+    invalidate_snapshots(symbol)
 
     if res.get('status')=='queued':
         send_warn(f"{symbol} {strike}{side}: order queued due to session; will auto-flush")
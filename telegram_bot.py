@@ -1,18 +1,75 @@
-import os
+import atexit, os, queue, threading
 import requests
+from requests.adapters import HTTPAdapter
 
 TOKEN = os.getenv('TELEGRAM_BOT_TOKEN_EXPIRY')
 CHAT_ID = os.getenv('TELEGRAM_CHAT_ID_EXPIRY')
 API = f"https://api.telegram.org/bot{TOKEN}/sendMessage" if TOKEN else None
+MAX_TEXT = 4096  # Telegram message length limit
+
+_q = queue.SimpleQueue()
+_sender = None
+_sender_lock = threading.Lock()
+_STOP = object()
+
+# One pooled connection to api.telegram.org; the TLS handshake is paid once
+_session = requests.Session()
+_session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=4))
+
+def _post(text: str) -> None:
+    try:
+        _session.post(API, json={"chat_id": CHAT_ID, "text": text}, timeout=10)
+    except Exception as e:
+        print('TG error:', e)
+
+def _drain() -> None:
+    # Alerts queued while a post is in flight go out together in one message
+    while True:
+        text = _q.get()
+        if text is _STOP:
+            return
+        batch = [text]; size = len(text)
+        while True:
+            try:
+                nxt = _q.get_nowait()
+            except queue.Empty:
+                break
+            if nxt is _STOP or size + len(nxt) + 2 > MAX_TEXT:
+                _post("\n\n".join(batch))
+                if nxt is _STOP:
+                    return
+                batch = []; size = 0
+            batch.append(nxt); size += len(nxt) + 2
+        _post("\n\n".join(batch))
+
+def _ensure_sender() -> None:
+    global _sender
+    if _sender is not None:
+        return
+    with _sender_lock:
+        if _sender is None:
+            _sender = threading.Thread(target=_drain, name='telegram-sender', daemon=True)
+            _sender.start()
+
+def close() -> None:
+    """Send queued alerts and stop the sender thread."""
+    global _sender
+    with _sender_lock:
+        if _sender is None:
+            return
+        _q.put(_STOP)
+        _sender.join(timeout=15)
+        _sender = None
+
+atexit.register(close)
 
 def _send_text(text: str):
     if not (TOKEN and CHAT_ID and API):
         print('TG (mock):', text)
         return
-    try:
-        requests.post(API, json={"chat_id": CHAT_ID, "text": text}, timeout=10)
-    except Exception as e:
-        print('TG error:', e)
+    # Never block the strategy tick on Telegram I/O
+    _ensure_sender()
+    _q.put_nowait(text[:MAX_TEXT])
 
 def send(msg: str) -> None:
     _send_text(msg)
@@ -3,13 +3,18 @@ Trade logging module for Sandy Viper Bot
 Handles all trade-related logging and data persistence
 """
 
+import atexit
 import logging
 import json
+import os
 import csv
-from datetime import datetime
-from typing import Dict, Any, Optional, List
+import queue
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, Any, Optional, List, Iterator
 from pathlib import Path
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, fields
 
 
 @dataclass
@@ -27,6 +32,17 @@ class TradeLog:
     status: str = "PENDING"
 
 
+class _JsonArg:
+    """Log argument that is only serialized if the record is emitted"""
+    __slots__ = ('value',)
+    
+    def __init__(self, value: Any):
+        self.value = value
+    
+    def __str__(self) -> str:
+        return json.dumps(self.value)
+
+
 class TradeLogger:
     """Trade logger class"""
     
@@ -43,93 +59,179 @@ class TradeLogger:
         file_handler = logging.FileHandler(log_file)
         file_handler.setLevel(logging.INFO)
         
-        # Create console handler
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.INFO)
-        
         # Create formatter
         formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
         file_handler.setFormatter(formatter)
-        console_handler.setFormatter(formatter)
         
-        # Add handlers to logger
+        # Add handlers to logger; console echo is opt-in via VIPER_CONSOLE_LOG=1
         if not self.logger.handlers:
             self.logger.addHandler(file_handler)
-            self.logger.addHandler(console_handler)
+            if os.getenv('VIPER_CONSOLE_LOG') == '1':
+                console_handler = logging.StreamHandler()
+                console_handler.setLevel(logging.INFO)
+                console_handler.setFormatter(formatter)
+                self.logger.addHandler(console_handler)
+        
+        # Trade CSV stays open for the day, JSON Lines for the hour;
+        # column order is fixed by TradeLog
+        self._fields = [f.name for f in fields(TradeLog)]
+        self._current_date: Optional[date] = None
+        self._rollover_at = 0.0  # Epoch seconds of the next hour boundary
+        self._csv_path: Optional[Path] = None
+        self._json_path: Optional[Path] = None
+        self._csv_fp = None
+        self._csv_writer = None
+        self._json_fp = None
+        
+        # Trade persistence runs on a writer thread, off the trading path
+        self._trade_queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+        atexit.register(self.flush)
     
     def log_trade(self, trade: TradeLog) -> None:
-        """Log a trade"""
-        trade_dict = asdict(trade)
+        """Log a trade (persisted asynchronously; see flush)"""
+        self._ensure_writer()
+        # Snapshot now, since the caller may update status/pnl before the writer
+        # runs; TradeLog is flat, so a shallow copy is enough
+        self._trade_queue.put(dict(trade.__dict__))
+    
+    def flush(self) -> None:
+        """Block until every queued trade has been written"""
+        if self._writer is not None:
+            self._trade_queue.join()
+    
+    def _ensure_writer(self) -> None:
+        """Start the trade writer thread on first use"""
+        if self._writer is not None:
+            return
+        
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._drain_trades, name='trade-writer', daemon=True)
+                self._writer.start()
+    
+    def _drain_trades(self) -> None:
+        """Writer thread: persist queued trades, flushing once the queue is idle"""
+        while True:
+            trade_dict = self._trade_queue.get()
+            try:
+                self._write_trade(trade_dict)
+                if self._trade_queue.empty():
+                    self._csv_fp.flush()
+                    self._json_fp.flush()
+            except Exception as e:
+                self.logger.error(f"Trade write error: {str(e)}")
+            finally:
+                self._trade_queue.task_done()
+    
+    def _write_trade(self, trade_dict: Dict[str, Any]) -> None:
+        """Write one trade record (a TradeLog snapshot) to the log, CSV and JSON Lines files"""
+        self._paths()
         
-        # Log to file
-        self.logger.info(f"TRADE: {json.dumps(trade_dict)}")
+        # Log to file (JSON is built only if a handler emits the record)
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info("TRADE: %s", _JsonArg(trade_dict))
         
         # Save to CSV
-        self._save_to_csv(trade)
+        self._save_to_csv(trade_dict)
         
         # Save to JSON
-        self._save_to_json(trade)
+        self._save_to_json(trade_dict)
     
-    def _save_to_csv(self, trade: TradeLog) -> None:
-        """Save trade to CSV file"""
-        csv_file = self.log_dir / f"trades_{datetime.now().strftime('%Y%m%d')}.csv"
+    def _paths(self) -> None:
+        """Make sure the open trade files belong to the current hour"""
+        if time.time() >= self._rollover_at:
+            self._rollover(datetime.now())
+    
+    def _rollover(self, now: datetime) -> None:
+        """Switch to this hour's JSON Lines partition (and today's CSV)"""
+        if now.date() != self._current_date:
+            self.close_files()
+            self._current_date = now.date()
+            self._csv_path = self.log_dir / f"trades_{now.strftime('%Y%m%d')}.csv"
+            self._csv_fp = open(self._csv_path, 'a', newline='')
+            self._csv_writer = csv.writer(self._csv_fp)
+            
+            # Write header for a new file
+            if self._csv_fp.tell() == 0:
+                self._csv_writer.writerow(self._fields)
+        elif self._json_fp is not None:
+            self._json_fp.close()
         
-        # Check if file exists to write header
-        file_exists = csv_file.exists()
+        self._json_path = self.log_dir / f"trades_{now.strftime('%Y%m%d_%H')}.jsonl"
+        self._json_fp = open(self._json_path, 'a')
         
-        with open(csv_file, 'a', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=asdict(trade).keys())
-            
-            if not file_exists:
-                writer.writeheader()
-            
-            writer.writerow(asdict(trade))
+        hour_start = now.replace(minute=0, second=0, microsecond=0)
+        self._rollover_at = (hour_start + timedelta(hours=1)).timestamp()
+    
+    def close_files(self) -> None:
+        """Close the open trade CSV and JSON Lines files, if any"""
+        for fp in (self._csv_fp, self._json_fp):
+            if fp is not None:
+                fp.close()
+        self._csv_fp = None
+        self._csv_writer = None
+        self._json_fp = None
+        self._current_date = None
+        self._rollover_at = 0.0
+    
+    def _save_to_csv(self, trade_dict: Dict[str, Any]) -> None:
+        """Save trade to CSV file"""
+        self._csv_writer.writerow([trade_dict[name] for name in self._fields])
+    
+    def _save_to_json(self, trade_dict: Dict[str, Any]) -> None:
+        """Append trade to the hour's JSON Lines file"""
+        self._json_fp.write(json.dumps(trade_dict, separators=(',', ':')) + '\n')
     
-    def _save_to_json(self, trade: TradeLog) -> None:
-        """Save trade to JSON file"""
-        json_file = self.log_dir / f"trades_{datetime.now().strftime('%Y%m%d')}.json"
+    def iter_daily_trades(self, date: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Stream trade records for a specific date, one hourly partition at a time"""
+        self.flush()
+        
+        if date is None:
+            date = datetime.now().strftime('%Y%m%d')
         
-        trades = []
+        # A day can span an upgrade: trades written before the switch to
+        # JSON Lines come first, then the daily file, then hourly partitions
+        json_file = self.log_dir / f"trades_{date}.json"
         if json_file.exists():
             with open(json_file, 'r') as f:
-                trades = json.load(f)
-        
-        trades.append(asdict(trade))
-        
-        with open(json_file, 'w') as f:
-            json.dump(trades, f, indent=2)
+                yield from json.load(f)
+        
+        paths = [self.log_dir / f"trades_{date}.jsonl"]
+        paths += sorted(self.log_dir.glob(f"trades_{date}_*.jsonl"))
+        
+        for path in paths:
+            if not path.exists():
+                continue
+            with open(path, 'r') as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
     
     def get_daily_trades(self, date: Optional[str] = None) -> List[TradeLog]:
         """Get trades for a specific date"""
-        if date is None:
-            date = datetime.now().strftime('%Y%m%d')
-        
-        json_file = self.log_dir / f"trades_{date}.json"
-        
-        if not json_file.exists():
-            return []
-        
-        with open(json_file, 'r') as f:
-            trades_data = json.load(f)
-        
-        return [TradeLog(**trade) for trade in trades_data]
+        return [TradeLog(**trade) for trade in self.iter_daily_trades(date)]
     
     def calculate_daily_pnl(self, date: Optional[str] = None) -> float:
-        """Calculate daily P&L"""
-        trades = self.get_daily_trades(date)
-        return sum(trade.pnl for trade in trades if trade.pnl is not None)
+        """Calculate daily P&L without loading the whole day"""
+        return sum(trade['pnl'] for trade in self.iter_daily_trades(date) if trade.get('pnl') is not None)
+    
+    def is_info_enabled(self) -> bool:
+        """Whether INFO records would be emitted"""
+        return self.logger.isEnabledFor(logging.INFO)
     
-    def log_info(self, message: str) -> None:
-        """Log general information"""
-        self.logger.info(message)
+    def log_info(self, message: str, *args: Any) -> None:
+        """Log general information (args are %-formatted lazily)"""
+        self.logger.info(message, *args)
     
-    def log_error(self, message: str) -> None:
+    def log_error(self, message: str, *args: Any) -> None:
         """Log error message"""
-        self.logger.error(message)
+        self.logger.error(message, *args)
     
-    def log_warning(self, message: str) -> None:
+    def log_warning(self, message: str, *args: Any) -> None:
         """Log warning message"""
-        self.logger.warning(message)
+        self.logger.warning(message, *args)
 
 
 # Global logger instance
@@ -3,11 +3,16 @@ DateTime utility functions for Sandy Viper Bot
 Handles market timings, session management, and date operations
 """
 
-from datetime import datetime, timedelta, time
+import functools
+from datetime import date, datetime, timedelta, time
 from typing import Optional, Tuple, List
-import pytz
+from zoneinfo import ZoneInfo
 from dataclasses import dataclass
 
+# Days to the next / previous weekday, indexed by weekday() (Monday=0)
+_NEXT_DELTA = (1, 1, 1, 1, 3, 2, 1)
+_PREV_DELTA = (3, 1, 1, 1, 1, 1, 2)
+
 
 @dataclass
 class TradingSession:
@@ -22,7 +27,7 @@ class DateTimeUtils:
     """DateTime utility functions"""
     
     # Indian Standard Time
-    IST = pytz.timezone('Asia/Kolkata')
+    IST = ZoneInfo('Asia/Kolkata')
     
     # Market timings
     MARKET_OPEN = time(9, 15)  # 9:15 AM
@@ -35,6 +40,25 @@ class DateTimeUtils:
     AFTER_MARKET_START = time(15, 30)  # 3:30 PM
     AFTER_MARKET_END = time(16, 0)     # 4:00 PM
     
+    # Same boundaries as minutes since midnight
+    _MKT_OPEN_M = MARKET_OPEN.hour * 60 + MARKET_OPEN.minute
+    _MKT_CLOSE_M = MARKET_CLOSE.hour * 60 + MARKET_CLOSE.minute
+    _PRE_START_M = PRE_MARKET_START.hour * 60 + PRE_MARKET_START.minute
+    _PRE_END_M = PRE_MARKET_END.hour * 60 + PRE_MARKET_END.minute
+    _AFTER_START_M = AFTER_MARKET_START.hour * 60 + AFTER_MARKET_START.minute
+    _AFTER_END_M = AFTER_MARKET_END.hour * 60 + AFTER_MARKET_END.minute
+    
+    @staticmethod
+    def _now_minutes(dt: datetime) -> int:
+        """Minutes since midnight for a datetime"""
+        return dt.hour * 60 + dt.minute
+    
+    @staticmethod
+    def _past_minute(dt: datetime, minutes: int) -> bool:
+        """True if dt is strictly later than the given minute of day"""
+        now = dt.hour * 60 + dt.minute
+        return now > minutes or (now == minutes and (dt.second or dt.microsecond) != 0)
+    
     @classmethod
     def get_current_ist_time(cls) -> datetime:
         """Get current time in IST"""
@@ -50,8 +74,8 @@ class DateTimeUtils:
         if current_time.weekday() >= 5:  # Saturday or Sunday
             return False
         
-        current_time_only = current_time.time()
-        return cls.MARKET_OPEN <= current_time_only <= cls.MARKET_CLOSE
+        # Closing bound is inclusive only at hh:mm:00 exactly, like a time() comparison
+        return cls._MKT_OPEN_M <= cls._now_minutes(current_time) and not cls._past_minute(current_time, cls._MKT_CLOSE_M)
     
     @classmethod
     def is_pre_market(cls, current_time: Optional[datetime] = None) -> bool:
@@ -62,8 +86,7 @@ class DateTimeUtils:
         if current_time.weekday() >= 5:  # Weekend
             return False
         
-        current_time_only = current_time.time()
-        return cls.PRE_MARKET_START <= current_time_only < cls.PRE_MARKET_END
+        return cls._PRE_START_M <= cls._now_minutes(current_time) < cls._PRE_END_M
     
     @classmethod
     def is_after_market(cls, current_time: Optional[datetime] = None) -> bool:
@@ -74,8 +97,7 @@ class DateTimeUtils:
         if current_time.weekday() >= 5:  # Weekend
             return False
         
-        current_time_only = current_time.time()
-        return cls.AFTER_MARKET_START <= current_time_only <= cls.AFTER_MARKET_END
+        return cls._AFTER_START_M <= cls._now_minutes(current_time) and not cls._past_minute(current_time, cls._AFTER_END_M)
     
     @classmethod
     def get_market_session(cls, current_time: Optional[datetime] = None) -> str:
@@ -83,17 +105,10 @@ class DateTimeUtils:
         if current_time is None:
             current_time = cls.get_current_ist_time()
         
-        if current_time.weekday() >= 5:
-            return "CLOSED_WEEKEND"
-        
-        if cls.is_pre_market(current_time):
-            return "PRE_MARKET"
-        elif cls.is_market_open(current_time):
-            return "MARKET_OPEN"
-        elif cls.is_after_market(current_time):
-            return "AFTER_MARKET"
-        else:
-            return "CLOSED"
+        index = current_time.weekday() * 1440 + cls._now_minutes(current_time)
+        if current_time.second or current_time.microsecond:
+            return _SESSION_NAMES[_SESSION_TABLE[index]]
+        return _SESSION_NAMES[_SESSION_TABLE_ON_MINUTE[index]]
     
     @classmethod
     def time_to_market_open(cls, current_time: Optional[datetime] = None) -> Optional[timedelta]:
@@ -113,12 +128,9 @@ class DateTimeUtils:
         )
         
         # If market opening time has passed today, move to next weekday
-        if current_time.time() > cls.MARKET_OPEN or current_time.weekday() >= 5:
-            next_open += timedelta(days=1)
-            
-            # Skip weekends
-            while next_open.weekday() >= 5:
-                next_open += timedelta(days=1)
+        weekday = current_time.weekday()
+        if cls._now_minutes(current_time) >= cls._MKT_OPEN_M or weekday >= 5:
+            next_open += timedelta(days=_NEXT_DELTA[weekday])
         
         return next_open - current_time
     
@@ -143,17 +155,7 @@ class DateTimeUtils:
     @classmethod
     def get_trading_days(cls, start_date: datetime, end_date: datetime) -> List[datetime]:
         """Get list of trading days between two dates"""
-        trading_days = []
-        current_date = start_date.date()
-        end_date = end_date.date()
-        
-        while current_date <= end_date:
-            # Check if it's a weekday
-            if current_date.weekday() < 5:
-                trading_days.append(datetime.combine(current_date, time()))
-            current_date += timedelta(days=1)
-        
-        return trading_days
+        return list(_trading_days(start_date.date(), end_date.date()))
     
     @classmethod
     def is_trading_day(cls, date: datetime) -> bool:
@@ -166,13 +168,7 @@ class DateTimeUtils:
         if date is None:
             date = cls.get_current_ist_time()
         
-        next_day = date + timedelta(days=1)
-        
-        # Skip weekends
-        while next_day.weekday() >= 5:
-            next_day += timedelta(days=1)
-        
-        return next_day
+        return date + timedelta(days=_NEXT_DELTA[date.weekday()])
     
     @classmethod
     def get_previous_trading_day(cls, date: Optional[datetime] = None) -> datetime:
@@ -180,13 +176,7 @@ class DateTimeUtils:
         if date is None:
             date = cls.get_current_ist_time()
         
-        prev_day = date - timedelta(days=1)
-        
-        # Skip weekends
-        while prev_day.weekday() >= 5:
-            prev_day -= timedelta(days=1)
-        
-        return prev_day
+        return date - timedelta(days=_PREV_DELTA[date.weekday()])
     
     @classmethod
     def format_time_duration(cls, td: timedelta) -> str:
@@ -211,25 +201,10 @@ class DateTimeUtils:
     
     @classmethod
     def get_expiry_dates(cls, symbol: str, months_ahead: int = 3) -> List[datetime]:
-        """Get option expiry dates for given symbol"""
+        """Get option expiry dates for given symbol (at market close, IST)"""
         current_date = cls.get_current_ist_time()
-        expiry_dates = []
-        
-        # For major indices, expiry is every Thursday
-        if symbol.upper() in ['NIFTY', 'BANKNIFTY', 'FINNIFTY']:
-            # Find next Thursday
-            days_ahead = (3 - current_date.weekday()) % 7
-            if days_ahead == 0 and current_date.time() > cls.MARKET_CLOSE:
-                days_ahead = 7
-            
-            next_thursday = current_date + timedelta(days=days_ahead)
-            
-            # Get expiry dates for specified months
-            for _ in range(months_ahead * 4):  # Approximately 4 weeks per month
-                expiry_dates.append(next_thursday)
-                next_thursday += timedelta(weeks=1)
-        
-        return expiry_dates
+        after_close = cls._past_minute(current_date, cls._MKT_CLOSE_M)
+        return list(_expiry_dates(symbol.upper(), current_date.date(), after_close, months_ahead))
     
     @classmethod
     def get_session_info(cls, current_time: Optional[datetime] = None) -> TradingSession:
@@ -247,3 +222,66 @@ class DateTimeUtils:
             return TradingSession("After-Market", cls.AFTER_MARKET_START, cls.AFTER_MARKET_END, True)
         else:
             return TradingSession("Closed", time(0, 0), time(0, 0), False)
+
+
+# Session for every (weekday, minute-of-day), indexed weekday * 1440 + minute.
+# _SESSION_TABLE covers hh:mm:01-hh:mm:59; _SESSION_TABLE_ON_MINUTE covers the
+# exact hh:mm:00 instant, where the inclusive closing bounds still apply
+_SESSION_NAMES = ("CLOSED_WEEKEND", "PRE_MARKET", "MARKET_OPEN", "AFTER_MARKET", "CLOSED")
+
+
+def _session_code(weekday: int, minutes: int, on_minute: bool) -> int:
+    """Index into _SESSION_NAMES for a weekday and minute of day"""
+    if weekday >= 5:
+        return 0
+    if DateTimeUtils._PRE_START_M <= minutes < DateTimeUtils._PRE_END_M:
+        return 1
+    if DateTimeUtils._MKT_OPEN_M <= minutes < DateTimeUtils._MKT_CLOSE_M + on_minute:
+        return 2
+    if DateTimeUtils._AFTER_START_M <= minutes < DateTimeUtils._AFTER_END_M + on_minute:
+        return 3
+    return 4
+
+
+_SESSION_TABLE = bytes(_session_code(weekday, minutes, False) for weekday in range(7) for minutes in range(1440))
+_SESSION_TABLE_ON_MINUTE = bytes(_session_code(weekday, minutes, True) for weekday in range(7) for minutes in range(1440))
+
+
+# Date-keyed caches: results only change when the calendar day (or the
+# expiry-day close) rolls over, so repeated calls within a session are hits
+@functools.lru_cache(maxsize=64)
+def _trading_days(start: date, end: date) -> Tuple[datetime, ...]:
+    """Weekdays from start to end inclusive, as midnight datetimes"""
+    trading_days = []
+    current_date = start
+    
+    while current_date <= end:
+        # Check if it's a weekday
+        if current_date.weekday() < 5:
+            trading_days.append(datetime.combine(current_date, time()))
+        current_date += timedelta(days=1)
+    
+    return tuple(trading_days)
+
+
+@functools.lru_cache(maxsize=64)
+def _expiry_dates(symbol: str, today: date, after_close: bool, months_ahead: int) -> Tuple[datetime, ...]:
+    """Weekly Thursday expiries from today for index symbols"""
+    expiry_dates = []
+    
+    # For major indices, expiry is every Thursday
+    if symbol in ['NIFTY', 'BANKNIFTY', 'FINNIFTY']:
+        # Find next Thursday
+        days_ahead = (3 - today.weekday()) % 7
+        if days_ahead == 0 and after_close:
+            days_ahead = 7
+        
+        next_thursday = datetime.combine(today + timedelta(days=days_ahead), DateTimeUtils.MARKET_CLOSE,
+                                         tzinfo=DateTimeUtils.IST)
+        
+        # Get expiry dates for specified months
+        for _ in range(months_ahead * 4):  # Approximately 4 weeks per month
+            expiry_dates.append(next_thursday)
+            next_thursday += timedelta(weeks=1)
+    
+    return tuple(expiry_dates)
@@ -4,19 +4,91 @@ Handles file operations, data persistence, and backup management
 """
 
 import os
+import errno
 import json
 import csv
+import fnmatch
+import math
+import mmap
 import shutil
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, Iterator, List, Optional, Union
 from datetime import datetime
 import pickle
+import struct
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# zlib-ng is a drop-in zlib with SIMD deflate/crc32; zipfile only touches
+# its module-level zlib reference, so swapping it speeds up archive I/O
+try:
+    from zlib_ng import zlib_ng
+    zipfile.zlib = zlib_ng
+except ImportError:
+    zlib_ng = None
 
 
 class FileUtils:
     """File operation utilities"""
     
+    # Files above this size are parsed straight from a memory map
+    MMAP_JSON_MIN_BYTES = 64 * 1024
+    
+    # Bytes per copy_file_range call when copying in-kernel
+    COPY_CHUNK_BYTES = 8 * 1024 * 1024
+    
+    # Already-compressed payloads are stored as-is in archives
+    STORED_SUFFIXES = frozenset({'.gz', '.zip', '.bz2', '.xz', '.png', '.jpg', '.jpeg'})
+    
+    # msgpack extension code for NumPy arrays in save_fast/load_fast
+    _NDARRAY_EXT = 1
+    
+    # Pickles with out-of-band buffers are framed as one file:
+    # magic, stream length, buffer count, pickle stream, then each buffer
+    # behind its own length prefix. Plain pickles never start with the magic.
+    _PICKLE_MAGIC = b'SVPKL5\x00\x00'
+    _PICKLE_HEADER = struct.Struct('<8sQQ')
+    _BUFFER_HEADER = struct.Struct('<Q')
+    
+    @staticmethod
+    def _write_atomic(path: Path, parts: List[Any]) -> None:
+        """Write byte chunks to a temp file and swap it in, so readers never see a torn file"""
+        tmp_path = path.with_suffix(f"{path.suffix}.tmp.{os.getpid()}")
+        try:
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            with os.fdopen(fd, 'wb') as f:
+                for part in parts:
+                    f.write(part)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+    
+    @staticmethod
+    def _has_non_finite(obj: Any) -> bool:
+        """True if a NaN/Infinity float appears anywhere in plain JSON data"""
+        if isinstance(obj, (float, np.floating)):
+            return not math.isfinite(obj)
+        if isinstance(obj, dict):
+            return any(FileUtils._has_non_finite(value) for value in obj.values())
+        if isinstance(obj, (list, tuple)):
+            return any(FileUtils._has_non_finite(value) for value in obj)
+        return False
+    
     @staticmethod
     def ensure_directory(directory_path: Union[str, Path]) -> Path:
         """Ensure directory exists, create if it doesn't"""
@@ -24,13 +96,81 @@ class FileUtils:
         path.mkdir(parents=True, exist_ok=True)
         return path
     
+    @staticmethod
+    def _scan_files(directory: Union[str, Path], recursive: bool = False) -> Iterator[os.DirEntry]:
+        """Yield regular-file entries; DirEntry caches type and stat from the scan"""
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_file(follow_symlinks=False):
+                    yield entry
+                elif recursive and entry.is_dir(follow_symlinks=False):
+                    yield from FileUtils._scan_files(entry.path, recursive)
+    
+    @staticmethod
+    def _copy_file(source: Union[str, Path], destination: Union[str, Path]) -> None:
+        """copy2 equivalent that keeps the data copy inside the kernel where supported"""
+        if not hasattr(os, 'copy_file_range'):
+            shutil.copy2(source, destination)
+            return
+        
+        # Like copy2, a directory destination means "copy into it"
+        if os.path.isdir(destination):
+            destination = os.path.join(destination, os.path.basename(source))
+        
+        if os.path.exists(destination) and os.path.samefile(source, destination):
+            raise shutil.SameFileError(f"{source} and {destination} are the same file")
+        
+        src_fd = os.open(source, os.O_RDONLY)
+        try:
+            dst_fd = os.open(destination, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+            try:
+                while os.copy_file_range(src_fd, dst_fd, FileUtils.COPY_CHUNK_BYTES):
+                    pass
+            except OSError as e:
+                # Filesystems/kernels without support: let shutil pick a path
+                if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+                    raise
+                os.close(dst_fd)
+                dst_fd = None
+                shutil.copy2(source, destination)
+                return
+            finally:
+                if dst_fd is not None:
+                    os.close(dst_fd)
+        finally:
+            os.close(src_fd)
+        
+        shutil.copystat(source, destination)
+    
+    @staticmethod
+    def _tree_size(directory: str) -> int:
+        """Total file size under one directory (worker for get_directory_size)"""
+        try:
+            return sum(entry.stat().st_size for entry in FileUtils._scan_files(directory, recursive=True))
+        except OSError:
+            return 0
+    
     @staticmethod
     def read_json(file_path: Union[str, Path]) -> Optional[Dict[str, Any]]:
         """Read JSON file safely"""
         try:
+            if orjson is not None:
+                try:
+                    # Large files: let orjson parse the mapped pages, no read() copy
+                    if os.path.getsize(file_path) > FileUtils.MMAP_JSON_MIN_BYTES:
+                        with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                            with memoryview(mm) as view:
+                                return orjson.loads(view)
+                    
+                    with open(file_path, 'rb') as f:
+                        return orjson.loads(f.read())
+                except orjson.JSONDecodeError:
+                    # Files from the stdlib writer may hold NaN/Infinity, which orjson rejects
+                    pass
+            
             with open(file_path, 'r', encoding='utf-8') as f:
                 return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError, IOError) as e:
+        except (FileNotFoundError, json.JSONDecodeError, IOError, ValueError) as e:
             print(f"Error reading JSON file {file_path}: {e}")
             return None
     
@@ -44,8 +184,21 @@ class FileUtils:
             if ensure_dir:
                 FileUtils.ensure_directory(path.parent)
             
-            with open(path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=indent, ensure_ascii=False, default=str)
+            payload = None
+            if orjson is not None:
+                # orjson only indents by 2; datetimes still go through str()
+                options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+                if indent:
+                    options |= orjson.OPT_INDENT_2
+                payload = orjson.dumps(data, default=str, option=options)
+                # orjson writes NaN/Infinity as null; keep the stdlib's tokens for those
+                if b'null' in payload and FileUtils._has_non_finite(data):
+                    payload = None
+            
+            if payload is None:
+                payload = json.dumps(data, indent=indent, ensure_ascii=False, default=str).encode('utf-8')
+            
+            FileUtils._write_atomic(path, [payload])
             
             return True
             
@@ -56,24 +209,35 @@ class FileUtils:
     @staticmethod
     def read_csv(file_path: Union[str, Path], has_header: bool = True) -> Optional[List[Dict[str, Any]]]:
         """Read CSV file to list of dictionaries"""
+        # Stays on the csv module so ragged rows keep DictReader's None/restkey
+        # handling; use read_csv_df for columnar access to large files
         try:
-            data = []
-            
-            with open(file_path, 'r', encoding='utf-8') as f:
-                if has_header:
-                    reader = csv.DictReader(f)
-                    data = list(reader)
-                else:
-                    reader = csv.reader(f)
-                    data = [{'col_' + str(i): value for i, value in enumerate(row)} 
-                           for row in reader]
-            
-            return data
+            return list(FileUtils.iter_csv(file_path, has_header))
             
         except (FileNotFoundError, IOError) as e:
             print(f"Error reading CSV file {file_path}: {e}")
             return None
     
+    @staticmethod
+    def iter_csv(file_path: Union[str, Path], has_header: bool = True) -> Iterator[Dict[str, Any]]:
+        """Stream CSV rows as dictionaries without holding the whole file"""
+        with open(file_path, 'r', encoding='utf-8', newline='') as f:
+            if has_header:
+                yield from csv.DictReader(f)
+            else:
+                for row in csv.reader(f):
+                    yield {'col_' + str(i): value for i, value in enumerate(row)}
+    
+    @staticmethod
+    def read_csv_df(file_path: Union[str, Path], has_header: bool = True, **kwargs: Any) -> Optional[pd.DataFrame]:
+        """Read CSV file into a DataFrame (no per-row dicts)"""
+        try:
+            return pd.read_csv(file_path, header=0 if has_header else None,
+                               memory_map=True, engine='c', **kwargs)
+        except (FileNotFoundError, IOError, pd.errors.ParserError, pd.errors.EmptyDataError) as e:
+            print(f"Error reading CSV file {file_path}: {e}")
+            return None
+    
     @staticmethod
     def write_csv(data: List[Dict[str, Any]], file_path: Union[str, Path], 
                   fieldnames: Optional[List[str]] = None, ensure_dir: bool = True) -> bool:
@@ -90,10 +254,11 @@ class FileUtils:
             if fieldnames is None:
                 fieldnames = list(data[0].keys())
             
-            with open(path, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(data)
+            with open(path, 'w', newline='', encoding='utf-8', buffering=1 << 16) as f:
+                # Positional rows keep the per-cell loop inside the C writer
+                writer = csv.writer(f)
+                writer.writerow(fieldnames)
+                writer.writerows([row.get(name, '') for name in fieldnames] for row in data)
             
             return True
             
@@ -118,12 +283,12 @@ class FileUtils:
                 fieldnames = list(data.keys())
             
             with open(path, 'a', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
+                writer = csv.writer(f)
                 
                 if not file_exists:
-                    writer.writeheader()
+                    writer.writerow(fieldnames)
                 
-                writer.writerow(data)
+                writer.writerow([data.get(name, '') for name in fieldnames])
             
             return True
             
@@ -151,7 +316,7 @@ class FileUtils:
             backup_name = f"{source_path.stem}_{timestamp}{source_path.suffix}"
             backup_path = backup_dir / backup_name
             
-            shutil.copy2(source_path, backup_path)
+            FileUtils._copy_file(source_path, backup_path)
             return backup_path
             
         except (IOError, OSError) as e:
@@ -167,8 +332,22 @@ class FileUtils:
             if ensure_dir:
                 FileUtils.ensure_directory(path.parent)
             
-            with open(path, 'wb') as f:
-                pickle.dump(obj, f)
+            # Protocol 5 hands large array payloads to buffer_callback
+            # instead of copying them into the pickle stream
+            buffers: List[pickle.PickleBuffer] = []
+            stream = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+            
+            if not buffers:
+                FileUtils._write_atomic(path, [stream])
+                return True
+            
+            # Stream and buffers share one file, so copies and backups stay loadable
+            parts = [FileUtils._PICKLE_HEADER.pack(FileUtils._PICKLE_MAGIC, len(stream), len(buffers)), stream]
+            for buffer in buffers:
+                raw = buffer.raw()
+                parts.append(FileUtils._BUFFER_HEADER.pack(raw.nbytes))
+                parts.append(raw)
+            FileUtils._write_atomic(path, parts)
             
             return True
             
@@ -179,12 +358,96 @@ class FileUtils:
     @staticmethod
     def load_pickle(file_path: Union[str, Path]) -> Any:
         """Load object from pickle file"""
+        try:
+            path = Path(file_path)
+            
+            # Plain pickles (no out-of-band buffers) load as before
+            with open(path, 'rb') as f:
+                if f.read(len(FileUtils._PICKLE_MAGIC)) != FileUtils._PICKLE_MAGIC:
+                    f.seek(0)
+                    return pickle.load(f)
+            
+            # Slice one writable block so arrays are rebuilt without copies
+            data = memoryview(bytearray(path.read_bytes()))
+            _, stream_size, buffer_count = FileUtils._PICKLE_HEADER.unpack_from(data, 0)
+            offset = FileUtils._PICKLE_HEADER.size
+            stream = data[offset:offset + stream_size]
+            offset += stream_size
+            
+            header = FileUtils._BUFFER_HEADER
+            buffers = []
+            for _ in range(buffer_count):
+                (size,) = header.unpack_from(data, offset)
+                offset += header.size
+                if offset + size > len(data):
+                    raise pickle.UnpicklingError("truncated pickle buffer")
+                buffers.append(data[offset:offset + size])
+                offset += size
+            
+            return pickle.loads(stream, buffers=buffers)
+        
+        except (FileNotFoundError, IOError, pickle.PickleError, struct.error) as e:
+            print(f"Error loading pickle file {file_path}: {e}")
+            return None
+    
+    @staticmethod
+    def _pack_default(obj: Any) -> Any:
+        """msgpack hook for NumPy values"""
+        if isinstance(obj, np.ndarray) and obj.dtype.kind in 'biufc':
+            array = np.ascontiguousarray(obj)
+            header = msgpack.packb((array.dtype.str, array.shape))
+            return msgpack.ExtType(FileUtils._NDARRAY_EXT, header + array.tobytes())
+        if isinstance(obj, np.generic):
+            return obj.item()
+        raise TypeError(f"Cannot serialize {type(obj).__name__}")
+    
+    @staticmethod
+    def _unpack_ext(code: int, data: bytes) -> Any:
+        """msgpack hook rebuilding NumPy arrays"""
+        if code != FileUtils._NDARRAY_EXT:
+            return msgpack.ExtType(code, data)
+        unpacker = msgpack.Unpacker()
+        unpacker.feed(data)
+        dtype, shape = unpacker.unpack()
+        # Copy out of the read-only ext payload so loaded arrays are writable, as with load_pickle
+        return np.frombuffer(data, dtype=dtype, offset=unpacker.tell()).reshape(shape).copy()
+    
+    @staticmethod
+    def save_fast(obj: Any, file_path: Union[str, Path], ensure_dir: bool = True) -> bool:
+        """Save plain data (dicts, lists, numbers, strings, NumPy arrays) with msgpack"""
+        if msgpack is None:
+            print(f"Error saving {file_path}: msgpack is not installed")
+            return False
+        
+        try:
+            path = Path(file_path)
+            
+            if ensure_dir:
+                FileUtils.ensure_directory(path.parent)
+            
+            payload = msgpack.packb(obj, use_bin_type=True, default=FileUtils._pack_default)
+            FileUtils._write_atomic(path, [payload])
+            
+            return True
+            
+        except (IOError, TypeError, ValueError) as e:
+            print(f"Error saving msgpack file {file_path}: {e}")
+            return False
+    
+    @staticmethod
+    def load_fast(file_path: Union[str, Path]) -> Any:
+        """Load data saved with save_fast (no code execution, unlike pickle)"""
+        if msgpack is None:
+            print(f"Error loading {file_path}: msgpack is not installed")
+            return None
+        
         try:
             with open(file_path, 'rb') as f:
-                return pickle.load(f)
+                return msgpack.unpackb(f.read(), raw=False, strict_map_key=False,
+                                       ext_hook=FileUtils._unpack_ext)
                 
-        except (FileNotFoundError, IOError, pickle.PickleError) as e:
-            print(f"Error loading pickle file {file_path}: {e}")
+        except (FileNotFoundError, IOError, ValueError) as e:
+            print(f"Error loading msgpack file {file_path}: {e}")
             return None
     
     @staticmethod
@@ -217,11 +480,18 @@ class FileUtils:
             cutoff_time = datetime.now().timestamp() - (max_age_days * 24 * 60 * 60)
             deleted_count = 0
             
-            for file_path in dir_path.glob(pattern):
-                if file_path.is_file():
-                    if file_path.stat().st_mtime < cutoff_time:
+            # Path-style patterns (e.g. "**/*.log") still need glob
+            if '/' in pattern or os.sep in pattern:
+                for file_path in dir_path.glob(pattern):
+                    if file_path.is_file() and file_path.stat().st_mtime < cutoff_time:
                         file_path.unlink()
                         deleted_count += 1
+                return deleted_count
+            
+            for entry in FileUtils._scan_files(dir_path):
+                if fnmatch.fnmatch(entry.name, pattern) and entry.stat().st_mtime < cutoff_time:
+                    os.unlink(entry.path)
+                    deleted_count += 1
             
             return deleted_count
             
@@ -239,20 +509,21 @@ class FileUtils:
             
             FileUtils.ensure_directory(archive_path.parent)
             
-            with zipfile.ZipFile(archive_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                if include_patterns:
-                    # Include specific patterns
-                    for pattern in include_patterns:
-                        for file_path in source_path.rglob(pattern):
-                            if file_path.is_file():
-                                arcname = file_path.relative_to(source_path)
-                                zipf.write(file_path, arcname)
-                else:
-                    # Include all files
-                    for file_path in source_path.rglob('*'):
-                        if file_path.is_file():
-                            arcname = file_path.relative_to(source_path)
-                            zipf.write(file_path, arcname)
+            with zipfile.ZipFile(archive_path, 'w', zipfile.ZIP_DEFLATED, allowZip64=True,
+                                 compresslevel=1, strict_timestamps=False) as zipf:
+                for entry in FileUtils._scan_files(source_path, recursive=True):
+                    arcname = Path(os.path.relpath(entry.path, source_path)).as_posix()
+                    
+                    # Include specific patterns, matched anywhere in the tree like rglob
+                    if include_patterns and not any(
+                            fnmatch.fnmatch(arcname, pattern) or fnmatch.fnmatch(arcname, '*/' + pattern)
+                            for pattern in include_patterns):
+                        continue
+                    
+                    if os.path.splitext(entry.name)[1].lower() in FileUtils.STORED_SUFFIXES:
+                        zipf.write(entry.path, arcname, compress_type=zipfile.ZIP_STORED)
+                    else:
+                        zipf.write(entry.path, arcname)
             
             return True
             
@@ -270,7 +541,30 @@ class FileUtils:
             FileUtils.ensure_directory(extract_path)
             
             with zipfile.ZipFile(archive_path, 'r') as zipf:
-                zipf.extractall(extract_path)
+                members = zipf.infolist()
+                workers = min(os.cpu_count() or 1, len(members))
+                if workers <= 1:
+                    zipf.extractall(extract_path)
+                    return True
+                
+                # Create the directory tree up front so workers never race on makedirs
+                for info in members:
+                    parts = [part for part in info.filename.split('/') if part not in ('', '.', '..')]
+                    if not info.is_dir():
+                        parts = parts[:-1]
+                    if parts:
+                        os.makedirs(extract_path.joinpath(*parts), exist_ok=True)
+            
+            # ZipFile reads are not thread-safe: each worker opens its own handle
+            def extract_slice(offset: int) -> None:
+                with zipfile.ZipFile(archive_path, 'r') as worker_zip:
+                    for info in members[offset::workers]:
+                        worker_zip.extract(info, extract_path)
+            
+            # zlib releases the GIL while inflating
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for _ in executor.map(extract_slice, range(workers)):
+                    pass
             
             return True
             
@@ -287,23 +581,26 @@ class FileUtils:
             if not log_path.exists():
                 return True
             
-            # Remove oldest log file if it exists
+            # Remove oldest log file if it exists (ENOENT instead of a stat probe)
             oldest_log = log_path.with_suffix(f'.{max_files}{log_path.suffix}')
-            if oldest_log.exists():
-                oldest_log.unlink()
+            try:
+                os.unlink(oldest_log)
+            except FileNotFoundError:
+                pass
             
-            # Rotate existing log files
+            # Rotate existing log files; gaps in the chain just raise ENOENT
             for i in range(max_files - 1, 0, -1):
                 current_log = log_path.with_suffix(f'.{i}{log_path.suffix}')
                 next_log = log_path.with_suffix(f'.{i + 1}{log_path.suffix}')
                 
-                if current_log.exists():
-                    current_log.rename(next_log)
+                try:
+                    os.replace(current_log, next_log)
+                except FileNotFoundError:
+                    pass
             
             # Move current log to .1
-            if log_path.exists():
-                rotated_log = log_path.with_suffix(f'.1{log_path.suffix}')
-                log_path.rename(rotated_log)
+            rotated_log = log_path.with_suffix(f'.1{log_path.suffix}')
+            os.replace(log_path, rotated_log)
             
             return True
             
@@ -314,15 +611,13 @@ class FileUtils:
     @staticmethod
     def safe_delete_file(file_path: Union[str, Path]) -> bool:
         """Safely delete a file"""
+        # One unlink; missing paths and directories just come back as errors
         try:
-            path = Path(file_path)
-            
-            if path.exists() and path.is_file():
-                path.unlink()
-                return True
+            os.unlink(file_path)
+            return True
             
+        except (FileNotFoundError, IsADirectoryError):
             return False
-            
         except (OSError, IOError) as e:
             print(f"Error deleting file {file_path}: {e}")
             return False
@@ -332,11 +627,19 @@ class FileUtils:
         """Get total size of directory in bytes"""
         try:
             total_size = 0
-            dir_path = Path(directory)
+            subdirs = []
             
-            for file_path in dir_path.rglob('*'):
-                if file_path.is_file():
-                    total_size += file_path.stat().st_size
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_file(follow_symlinks=False):
+                        total_size += entry.stat().st_size
+                    elif entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+            
+            # Walk top-level subtrees concurrently; stat() releases the GIL
+            if subdirs:
+                with ThreadPoolExecutor(max_workers=min(8, len(subdirs))) as executor:
+                    total_size += sum(executor.map(FileUtils._tree_size, subdirs))
             
             return total_size
             
@@ -357,7 +660,7 @@ class FileUtils:
             FileUtils.ensure_directory(dest_path.parent)
             
             # Copy file
-            shutil.copy2(source, destination)
+            FileUtils._copy_file(source, destination)
             return True
             
         except (IOError, OSError) as e:
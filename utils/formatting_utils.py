@@ -3,9 +3,52 @@ Formatting utility functions for Sandy Viper Bot
 Handles data formatting, display utilities, and output formatting
 """
 
+import functools
 from typing import Any, Dict, List, Optional, Union
 from datetime import datetime, timedelta
 from decimal import Decimal
+from types import MappingProxyType
+
+
+# strftime patterns for FormattingUtils.format_datetime, built once
+_FORMAT_PATTERNS = MappingProxyType({
+    "default": "%Y-%m-%d %H:%M:%S",
+    "short": "%d/%m/%Y %H:%M",
+    "date_only": "%d/%m/%Y",
+    "time_only": "%H:%M:%S",
+    "human": "%d %b %Y, %I:%M %p",
+    "iso": "%Y-%m-%dT%H:%M:%S",
+    "trading": "%d-%b-%Y %H:%M"
+})
+
+# Indian numbering scales, largest first: (threshold/divisor, suffix)
+_INDIAN_SCALES = ((10_000_000, "Cr"), (100_000, "L"))
+_CURRENCY_SCALES = _INDIAN_SCALES + ((1_000, "K"),)
+
+
+def _format_scaled(value: float, decimal_places: int, scales: tuple) -> Optional[str]:
+    """Format value in the first scale its magnitude reaches, None if below all"""
+    magnitude = abs(value)
+    for threshold, suffix in scales:
+        if magnitude >= threshold:
+            return f"{value / threshold:.{decimal_places}f} {suffix}"
+    return None
+
+
+@functools.lru_cache(maxsize=4096)
+def _format_option_symbol(symbol: str) -> str:
+    """Display form of an option symbol; positions re-render the same symbols every tick"""
+    from utils.market_utils import MarketUtils
+    parsed = MarketUtils.parse_option_symbol(symbol)
+    
+    if parsed:
+        return f"{parsed['underlying']} {parsed['strike']} {parsed['option_type']} (Exp: {parsed['expiry_date']})"
+    
+    return symbol
+
+
+# File size units, one per factor of 1024
+_SIZE_UNITS = ("B", "KB", "MB", "GB", "TB")
 
 
 class FormattingUtils:
@@ -23,15 +66,9 @@ class FormattingUtils:
             is_negative = amount_float < 0
             amount_float = abs(amount_float)
             
-            # Format with commas (Indian style)
-            if amount_float >= 10000000:  # 1 crore
-                formatted = f"{amount_float/10000000:.{decimal_places}f} Cr"
-            elif amount_float >= 100000:  # 1 lakh
-                formatted = f"{amount_float/100000:.{decimal_places}f} L"
-            elif amount_float >= 1000:  # 1 thousand
-                formatted = f"{amount_float/1000:.{decimal_places}f} K"
-            else:
-                formatted = f"{amount_float:.{decimal_places}f}"
+            # Format with Cr / L / K (Indian style)
+            formatted = (_format_scaled(amount_float, decimal_places, _CURRENCY_SCALES)
+                         or f"{amount_float:.{decimal_places}f}")
             
             # Add currency symbol and negative sign
             result = f"{currency}{formatted}"
@@ -63,17 +100,14 @@ class FormattingUtils:
             num_value = float(value)
             
             if use_commas:
-                # Indian numbering system
-                if abs(num_value) >= 10000000:  # 1 crore
-                    return f"{num_value/10000000:.{decimal_places}f} Cr"
-                elif abs(num_value) >= 100000:  # 1 lakh
-                    return f"{num_value/100000:.{decimal_places}f} L"
-                elif abs(num_value) >= 1000:  # 1 thousand
+                # Indian numbering system: Cr / L, plain commas below a lakh
+                scaled = _format_scaled(num_value, decimal_places, _INDIAN_SCALES)
+                if scaled is not None:
+                    return scaled
+                if abs(num_value) >= 1000:
                     return f"{num_value:,.{decimal_places}f}"
-                else:
-                    return f"{num_value:.{decimal_places}f}"
-            else:
-                return f"{num_value:.{decimal_places}f}"
+            
+            return f"{num_value:.{decimal_places}f}"
                 
         except (ValueError, TypeError):
             return "0"
@@ -84,18 +118,7 @@ class FormattingUtils:
         if not isinstance(dt, datetime):
             return "Invalid Date"
         
-        format_patterns = {
-            "default": "%Y-%m-%d %H:%M:%S",
-            "short": "%d/%m/%Y %H:%M",
-            "date_only": "%d/%m/%Y",
-            "time_only": "%H:%M:%S",
-            "human": "%d %b %Y, %I:%M %p",
-            "iso": "%Y-%m-%dT%H:%M:%S",
-            "trading": "%d-%b-%Y %H:%M"
-        }
-        
-        pattern = format_patterns.get(format_type, format_patterns["default"])
-        return dt.strftime(pattern)
+        return dt.strftime(_FORMAT_PATTERNS.get(format_type) or _FORMAT_PATTERNS["default"])
     
     @staticmethod
     def format_duration(td: timedelta) -> str:
@@ -131,19 +154,7 @@ class FormattingUtils:
         if not isinstance(symbol, str):
             return symbol
         
-        # Parse option symbol components
-        from utils.market_utils import MarketUtils
-        parsed = MarketUtils.parse_option_symbol(symbol)
-        
-        if parsed:
-            underlying = parsed['underlying']
-            strike = parsed['strike']
-            option_type = parsed['option_type']
-            expiry_date = parsed['expiry_date']
-            
-            return f"{underlying} {strike} {option_type} (Exp: {expiry_date})"
-        
-        return symbol
+        return _format_option_symbol(symbol)
     
     @staticmethod
     def format_pnl(pnl: Union[int, float], show_colors: bool = True) -> str:
@@ -179,29 +190,20 @@ class FormattingUtils:
         if headers is None:
             headers = list(data[0].keys())
         
-        # Calculate column widths
-        col_widths = {}
-        for header in headers:
-            col_widths[header] = len(str(header))
-            for row in data:
-                col_widths[header] = max(col_widths[header], len(str(row.get(header, ""))))
-        
-        # Create table
-        table_lines = []
-        
-        # Header
-        header_line = "| " + " | ".join(str(header).ljust(col_widths[header]) for header in headers) + " |"
-        separator_line = "+" + "+".join("-" * (col_widths[header] + 2) for header in headers) + "+"
+        # Stringify every cell once; widths and rows both reuse it
+        header_cells = [str(header) for header in headers]
+        cells = [[str(row.get(header, "")) for header in headers] for row in data]
+        col_widths = [max(len(header_cell), *(len(row_cells[i]) for row_cells in cells))
+                      for i, header_cell in enumerate(header_cells)]
         
-        table_lines.append(separator_line)
-        table_lines.append(header_line)
-        table_lines.append(separator_line)
+        def render(row_cells: List[str]) -> str:
+            return "| " + " | ".join(f"{cell:<{width}}" for cell, width in zip(row_cells, col_widths)) + " |"
         
-        # Data rows
-        for row in data:
-            row_line = "| " + " | ".join(str(row.get(header, "")).ljust(col_widths[header]) for header in headers) + " |"
-            table_lines.append(row_line)
+        separator_line = "+" + "+".join("-" * (width + 2) for width in col_widths) + "+"
         
+        # Header, data rows, closing separator
+        table_lines = [separator_line, render(header_cells), separator_line]
+        table_lines.extend(render(row_cells) for row_cells in cells)
         table_lines.append(separator_line)
         
         return "\n".join(table_lines)
@@ -286,11 +288,7 @@ class FormattingUtils:
         if size_bytes == 0:
             return "0 B"
         
-        size_names = ["B", "KB", "MB", "GB", "TB"]
-        i = 0
-        
-        while size_bytes >= 1024 and i < len(size_names) - 1:
-            size_bytes /= 1024.0
-            i += 1
+        # Unit index straight from the bit length: every 10 bits is one step of 1024
+        i = min(len(_SIZE_UNITS) - 1, (int(size_bytes).bit_length() - 1) // 10) if size_bytes >= 1024 else 0
         
-        return f"{size_bytes:.1f} {size_names[i]}"
+        return f"{size_bytes / (1 << (i * 10)):.1f} {_SIZE_UNITS[i]}"
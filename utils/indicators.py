@@ -5,190 +5,355 @@ Provides various technical analysis indicators
 
 import numpy as np
 import pandas as pd
-from typing import List, Tuple, Optional, Dict
+from collections import deque
+from typing import List, Tuple, Optional, Dict, Sequence, Union
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    
+    def njit(*args, **kwargs):
+        """No-op stand-in so kernels run as plain Python without numba"""
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+try:
+    import bottleneck
+except ImportError:
+    bottleneck = None
+
+# Indicators take plain lists or float64 arrays; arrays pass through uncopied
+PriceSeries = Union[Sequence[float], np.ndarray]
+
+# Record layouts for the batched level calculations, one row per bar
+_PIVOT_DTYPE = np.dtype([(name, np.float64) for name in ('pivot', 'r1', 'r2', 'r3', 's1', 's2', 's3')])
+_FIBONACCI_DTYPE = np.dtype([(name, np.float64) for name in ('0%', '23.6%', '38.2%', '50%', '61.8%', '100%')])
+
+
+@njit(cache=True)
+def _sma_kernel(x, period):
+    """Rolling mean via a running window sum"""
+    n = x.shape[0]
+    out = np.empty(n - period + 1)
+    window_sum = 0.0
+    for i in range(period):
+        window_sum += x[i]
+    out[0] = window_sum / period
+    for i in range(period, n):
+        window_sum += x[i] - x[i - period]
+        out[i - period + 1] = window_sum / period
+    return out
+
+
+@njit(cache=True)
+def _ema_kernel(x, period):
+    """EMA seeded with the SMA of the first period values"""
+    n = x.shape[0]
+    out = np.empty(n - period + 1)
+    multiplier = 2.0 / (period + 1)
+    first_sum = 0.0
+    for i in range(period):
+        first_sum += x[i]
+    out[0] = first_sum / period
+    for i in range(period, n):
+        out[i - period + 1] = x[i] * multiplier + out[i - period] * (1.0 - multiplier)
+    return out
+
+
+@njit(cache=True)
+def _macd_kernel(x, fast, slow, signal):
+    """Fast EMA, slow EMA and signal EMA in one pass (requires fast <= slow)"""
+    n = x.shape[0]
+    macd_len = n - slow + 1
+    signal_len = max(macd_len - signal + 1, 0)
+    out_macd = np.empty(macd_len)
+    out_signal = np.empty(signal_len)
+    out_hist = np.empty(signal_len)
+    mf = 2.0 / (fast + 1)
+    ms = 2.0 / (slow + 1)
+    msig = 2.0 / (signal + 1)
+    ef = 0.0
+    es = 0.0
+    esig = 0.0
+    for t in range(n):
+        value = x[t]
+        # Each EMA is seeded with the SMA of its first period values
+        if t < fast:
+            ef += value
+            if t == fast - 1:
+                ef /= fast
+        else:
+            ef = value * mf + ef * (1.0 - mf)
+        if t < slow:
+            es += value
+            if t == slow - 1:
+                es /= slow
+        else:
+            es = value * ms + es * (1.0 - ms)
+        if t < slow - 1:
+            continue
+        k = t - slow + 1
+        diff = ef - es
+        out_macd[k] = diff
+        if k < signal:
+            esig += diff
+            if k == signal - 1:
+                esig /= signal
+        else:
+            esig = diff * msig + esig * (1.0 - msig)
+        if k >= signal - 1:
+            out_signal[k - signal + 1] = esig
+            out_hist[k - signal + 1] = diff - esig
+    return out_macd, out_signal, out_hist
+
+
+@njit(cache=True)
+def _wilder_kernel(x, period):
+    """Wilder smoothing seeded with the mean of the first period values"""
+    n = x.shape[0]
+    out = np.empty(n - period + 1)
+    avg = 0.0
+    for i in range(period):
+        avg += x[i]
+    avg /= period
+    out[0] = avg
+    for i in range(period, n):
+        avg = (avg * (period - 1) + x[i]) / period
+        out[i - period + 1] = avg
+    return out
+
+
+def _as_f64(data: PriceSeries) -> np.ndarray:
+    """View data as a float64 array, copying only when it is not one already"""
+    if isinstance(data, np.ndarray) and data.dtype == np.float64:
+        return data
+    return np.asarray(data, dtype=np.float64)
+
+
+def _sma(prices: np.ndarray, period: int) -> np.ndarray:
+    """Rolling mean over a float64 array (empty when too short)"""
+    if prices.shape[0] < period:
+        return np.empty(0)
+    if NUMBA_AVAILABLE:
+        return _sma_kernel(prices, period)
+    
+    window_sums = np.empty(prices.shape[0] + 1)
+    window_sums[0] = 0.0
+    np.cumsum(prices, out=window_sums[1:])
+    return (window_sums[period:] - window_sums[:-period]) * (1.0 / period)
+
+
+def _ema(prices: np.ndarray, period: int) -> np.ndarray:
+    """EMA over a float64 array (empty when too short)"""
+    if prices.shape[0] < period:
+        return np.empty(0)
+    if NUMBA_AVAILABLE:
+        return _ema_kernel(prices, period)
+    
+    # Without numba the recurrence runs faster over Python floats than ndarray items
+    values = prices.tolist()
+    multiplier = 2 / (period + 1)
+    
+    # First EMA is SMA
+    ema_values = [sum(values[:period]) / period]
+    for i in range(period, len(values)):
+        ema_values.append((values[i] * multiplier) + (ema_values[-1] * (1 - multiplier)))
+    
+    return np.asarray(ema_values)
+
+
+def _rolling_max(values: np.ndarray, window: int) -> np.ndarray:
+    """Max of each full trailing window, O(n) via a monotonic index deque"""
+    if bottleneck is not None:
+        return bottleneck.move_max(values, window)[window - 1:]
+    
+    values = values.tolist()
+    out = []
+    candidates = deque()
+    for i, value in enumerate(values):
+        while candidates and values[candidates[-1]] <= value:
+            candidates.pop()
+        candidates.append(i)
+        if candidates[0] <= i - window:
+            candidates.popleft()
+        if i >= window - 1:
+            out.append(values[candidates[0]])
+    return np.asarray(out)
+
+
+def _rolling_min(values: np.ndarray, window: int) -> np.ndarray:
+    """Min of each full trailing window, O(n) via a monotonic index deque"""
+    if bottleneck is not None:
+        return bottleneck.move_min(values, window)[window - 1:]
+    
+    values = values.tolist()
+    out = []
+    candidates = deque()
+    for i, value in enumerate(values):
+        while candidates and values[candidates[-1]] >= value:
+            candidates.pop()
+        candidates.append(i)
+        if candidates[0] <= i - window:
+            candidates.popleft()
+        if i >= window - 1:
+            out.append(values[candidates[0]])
+    return np.asarray(out)
+
+
+if NUMBA_AVAILABLE:
+    # Compile on import so the first live call does not pay JIT latency
+    _sma_kernel(np.zeros(2), 1)
+    _ema_kernel(np.zeros(2), 1)
+    _macd_kernel(np.zeros(2), 1, 1, 1)
+    _wilder_kernel(np.zeros(2), 1)
 
 
 class TechnicalIndicators:
     """Technical indicators calculator"""
     
     @staticmethod
-    def sma(data: List[float], period: int) -> List[float]:
+    def sma(data: PriceSeries, period: int) -> List[float]:
         """Simple Moving Average"""
         if len(data) < period:
             return []
         
-        sma_values = []
-        for i in range(period - 1, len(data)):
-            avg = sum(data[i - period + 1:i + 1]) / period
-            sma_values.append(avg)
-        
-        return sma_values
+        return _sma(_as_f64(data), period).tolist()
     
     @staticmethod
-    def ema(data: List[float], period: int) -> List[float]:
+    def ema(data: PriceSeries, period: int) -> List[float]:
         """Exponential Moving Average"""
         if len(data) < period:
             return []
         
-        multiplier = 2 / (period + 1)
-        ema_values = []
-        
-        # First EMA is SMA
-        first_ema = sum(data[:period]) / period
-        ema_values.append(first_ema)
-        
-        # Calculate subsequent EMAs
-        for i in range(period, len(data)):
-            ema = (data[i] * multiplier) + (ema_values[-1] * (1 - multiplier))
-            ema_values.append(ema)
-        
-        return ema_values
+        return _ema(_as_f64(data), period).tolist()
     
     @staticmethod
-    def rsi(data: List[float], period: int = 14) -> List[float]:
-        """Relative Strength Index"""
+    def rsi(data: PriceSeries, period: int = 14) -> List[float]:
+        """Relative Strength Index (Wilder smoothing)"""
         if len(data) < period + 1:
             return []
         
-        gains = []
-        losses = []
-        
-        # Calculate price changes
-        for i in range(1, len(data)):
-            change = data[i] - data[i - 1]
-            if change > 0:
-                gains.append(change)
-                losses.append(0)
-            else:
-                gains.append(0)
-                losses.append(abs(change))
-        
-        rsi_values = []
-        
-        # Calculate RSI for each period
-        for i in range(period - 1, len(gains)):
-            avg_gain = sum(gains[i - period + 1:i + 1]) / period
-            avg_loss = sum(losses[i - period + 1:i + 1]) / period
-            
-            if avg_loss == 0:
-                rsi = 100
-            else:
-                rs = avg_gain / avg_loss
-                rsi = 100 - (100 / (1 + rs))
-            
-            rsi_values.append(rsi)
-        
-        return rsi_values
+        changes = np.diff(_as_f64(data))
+        avg_gain = _wilder_kernel(np.maximum(changes, 0.0), period)
+        avg_loss = _wilder_kernel(np.maximum(-changes, 0.0), period)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+        return np.where(avg_loss == 0, 100.0, rsi).tolist()
     
     @staticmethod
-    def macd(data: List[float], fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple[List[float], List[float], List[float]]:
+    def macd(data: PriceSeries, fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple[List[float], List[float], List[float]]:
         """MACD (Moving Average Convergence Divergence)"""
         if len(data) < slow:
             return [], [], []
         
-        ema_fast = TechnicalIndicators.ema(data, fast)
-        ema_slow = TechnicalIndicators.ema(data, slow)
+        prices = _as_f64(data)
+        if NUMBA_AVAILABLE and fast <= slow:
+            macd_line, signal_line, histogram = _macd_kernel(prices, fast, slow, signal)
+            return macd_line.tolist(), signal_line.tolist(), histogram.tolist()
+        
+        ema_fast = _ema(prices, fast)
+        ema_slow = _ema(prices, slow)
         
         # Align the EMAs (slow EMA starts later)
         start_index = slow - fast
         ema_fast_aligned = ema_fast[start_index:]
         
         # Calculate MACD line
-        macd_line = [fast_val - slow_val for fast_val, slow_val in zip(ema_fast_aligned, ema_slow)]
+        length = min(ema_fast_aligned.shape[0], ema_slow.shape[0])
+        macd_line = ema_fast_aligned[:length] - ema_slow[:length]
         
         # Calculate signal line (EMA of MACD)
-        signal_line = TechnicalIndicators.ema(macd_line, signal)
+        signal_line = _ema(macd_line, signal)
         
         # Calculate histogram
-        histogram = []
-        signal_start = len(macd_line) - len(signal_line)
-        for i in range(len(signal_line)):
-            hist = macd_line[signal_start + i] - signal_line[i]
-            histogram.append(hist)
+        histogram = macd_line[macd_line.shape[0] - signal_line.shape[0]:] - signal_line
         
-        return macd_line, signal_line, histogram
+        return macd_line.tolist(), signal_line.tolist(), histogram.tolist()
     
     @staticmethod
-    def bollinger_bands(data: List[float], period: int = 20, std_dev: float = 2) -> Tuple[List[float], List[float], List[float]]:
+    def bollinger_bands(data: PriceSeries, period: int = 20, std_dev: float = 2) -> Tuple[List[float], List[float], List[float]]:
         """Bollinger Bands"""
         if len(data) < period:
             return [], [], []
         
-        sma = TechnicalIndicators.sma(data, period)
-        upper_bands = []
-        lower_bands = []
+        # Rolling mean and population std from prefix sums of x and x^2;
+        # centering first keeps the x^2 sums small enough to stay accurate
+        prices = _as_f64(data)
+        offset = prices.mean()
+        centered = prices - offset
+        sums = np.concatenate(([0.0], np.cumsum(centered)))
+        squares = np.concatenate(([0.0], np.cumsum(centered * centered)))
         
-        for i in range(len(sma)):
-            data_slice = data[i:i + period]
-            std = np.std(data_slice)
-            upper_bands.append(sma[i] + (std_dev * std))
-            lower_bands.append(sma[i] - (std_dev * std))
+        mean = (sums[period:] - sums[:-period]) / period
+        variance = (squares[period:] - squares[:-period]) / period - mean * mean
+        std = np.sqrt(np.maximum(variance, 0.0))
         
-        return upper_bands, sma, lower_bands
+        sma = mean + offset
+        return (sma + std_dev * std).tolist(), sma.tolist(), (sma - std_dev * std).tolist()
     
     @staticmethod
-    def stochastic(high: List[float], low: List[float], close: List[float], 
+    def stochastic(high: PriceSeries, low: PriceSeries, close: PriceSeries, 
                   k_period: int = 14, d_period: int = 3) -> Tuple[List[float], List[float]]:
         """Stochastic Oscillator"""
         if len(high) < k_period or len(low) < k_period or len(close) < k_period:
             return [], []
         
-        k_values = []
+        closes = _as_f64(close)
+        n = min(len(high), len(low), closes.shape[0])
+        highest_highs = _rolling_max(_as_f64(high)[:n], k_period)
+        lowest_lows = _rolling_min(_as_f64(low)[:n], k_period)
         
-        for i in range(k_period - 1, len(close)):
-            highest_high = max(high[i - k_period + 1:i + 1])
-            lowest_low = min(low[i - k_period + 1:i + 1])
-            
-            if highest_high == lowest_low:
-                k_percent = 50  # Avoid division by zero
-            else:
-                k_percent = ((close[i] - lowest_low) / (highest_high - lowest_low)) * 100
-            
-            k_values.append(k_percent)
+        price_range = highest_highs - lowest_lows
+        with np.errstate(divide='ignore', invalid='ignore'):
+            k_percent = (closes[k_period - 1:n] - lowest_lows) / price_range * 100
+        k_values = np.where(price_range == 0, 50.0, k_percent)  # Avoid division by zero
         
         # Calculate %D (SMA of %K)
-        d_values = TechnicalIndicators.sma(k_values, d_period)
+        d_values = _sma(k_values, d_period)
         
-        return k_values, d_values
+        return k_values.tolist(), d_values.tolist()
     
     @staticmethod
-    def atr(high: List[float], low: List[float], close: List[float], period: int = 14) -> List[float]:
-        """Average True Range"""
+    def atr(high: PriceSeries, low: PriceSeries, close: PriceSeries, period: int = 14,
+            wilder: bool = False) -> List[float]:
+        """Average True Range (simple average, or Wilder smoothing with wilder=True)"""
         if len(high) < 2 or len(low) < 2 or len(close) < 2:
             return []
         
-        true_ranges = []
+        highs = _as_f64(high)[1:]
+        lows = _as_f64(low)[1:]
+        prev_close = _as_f64(close)[:-1]
         
-        for i in range(1, len(high)):
-            tr1 = high[i] - low[i]
-            tr2 = abs(high[i] - close[i - 1])
-            tr3 = abs(low[i] - close[i - 1])
-            true_range = max(tr1, tr2, tr3)
-            true_ranges.append(true_range)
+        true_ranges = np.maximum(np.maximum(highs - lows, np.abs(highs - prev_close)), np.abs(lows - prev_close))
         
-        return TechnicalIndicators.sma(true_ranges, period)
+        if wilder:
+            if true_ranges.shape[0] < period:
+                return []
+            return _wilder_kernel(true_ranges, period).tolist()
+        return _sma(true_ranges, period).tolist()
     
     @staticmethod
-    def support_resistance(data: List[float], window: int = 5) -> Tuple[List[float], List[float]]:
+    def support_resistance(data: PriceSeries, window: int = 5) -> Tuple[List[float], List[float]]:
         """Find support and resistance levels"""
-        supports = []
-        resistances = []
-        
-        for i in range(window, len(data) - window):
-            # Check for local minima (support)
-            is_support = all(data[i] <= data[i - j] for j in range(1, window + 1)) and \
-                        all(data[i] <= data[i + j] for j in range(1, window + 1))
-            
-            # Check for local maxima (resistance)
-            is_resistance = all(data[i] >= data[i - j] for j in range(1, window + 1)) and \
-                           all(data[i] >= data[i + j] for j in range(1, window + 1))
-            
-            if is_support:
-                supports.append(data[i])
-            if is_resistance:
-                resistances.append(data[i])
-        
-        return supports, resistances
+        if len(data) <= 2 * window:
+            return [], []
+        
+        # Every centred window [i - window, i + window] as a strided view (no copy)
+        prices = _as_f64(data)
+        windows = np.lib.stride_tricks.sliding_window_view(prices, 2 * window + 1)
+        centers = prices[window:len(prices) - window]
+        
+        # Ties count, as with the original <= / >= checks
+        support_idx = np.flatnonzero(windows.min(axis=1) == centers) + window
+        resistance_idx = np.flatnonzero(windows.max(axis=1) == centers) + window
+        
+        if isinstance(data, np.ndarray):
+            return data[support_idx].tolist(), data[resistance_idx].tolist()
+        return [data[i] for i in support_idx], [data[i] for i in resistance_idx]
     
     @staticmethod
     def pivot_points(high: float, low: float, close: float) -> Dict[str, float]:
@@ -205,6 +370,22 @@ class TechnicalIndicators:
             's3': low - 2 * (high - pivot)
         }
     
+    @staticmethod
+    def pivot_points_batch(high: PriceSeries, low: PriceSeries, close: PriceSeries) -> np.ndarray:
+        """Pivot points for many bars as a structured array with pivot_points' keys"""
+        highs, lows, closes = _as_f64(high), _as_f64(low), _as_f64(close)
+        pivot = (highs + lows + closes) / 3
+        
+        levels = np.empty(pivot.shape[0], dtype=_PIVOT_DTYPE)
+        levels['pivot'] = pivot
+        levels['r1'] = (2 * pivot) - lows
+        levels['r2'] = pivot + (highs - lows)
+        levels['r3'] = highs + 2 * (pivot - lows)
+        levels['s1'] = (2 * pivot) - highs
+        levels['s2'] = pivot - (highs - lows)
+        levels['s3'] = lows - 2 * (highs - pivot)
+        return levels
+    
     @staticmethod
     def fibonacci_retracement(high: float, low: float) -> Dict[str, float]:
         """Calculate Fibonacci retracement levels"""
@@ -220,21 +401,34 @@ class TechnicalIndicators:
         }
     
     @staticmethod
-    def analyze_trend(data: List[float], period: int = 20) -> str:
+    def fibonacci_retracement_batch(high: PriceSeries, low: PriceSeries) -> np.ndarray:
+        """Fibonacci retracement levels for many bars as a structured array"""
+        highs, lows = _as_f64(high), _as_f64(low)
+        diff = highs - lows
+        
+        levels = np.empty(highs.shape[0], dtype=_FIBONACCI_DTYPE)
+        levels['0%'] = highs
+        levels['23.6%'] = highs - (0.236 * diff)
+        levels['38.2%'] = highs - (0.382 * diff)
+        levels['50%'] = highs - (0.5 * diff)
+        levels['61.8%'] = highs - (0.618 * diff)
+        levels['100%'] = lows
+        return levels
+    
+    @staticmethod
+    def analyze_trend(data: PriceSeries, period: int = 20) -> str:
         """Analyze overall trend"""
         if len(data) < period:
             return "INSUFFICIENT_DATA"
         
-        recent_data = data[-period:]
-        sma_short = TechnicalIndicators.sma(recent_data, period // 2)
-        sma_long = TechnicalIndicators.sma(recent_data, period)
-        
-        if not sma_short or not sma_long:
-            return "INSUFFICIENT_DATA"
+        # Only the latest value of each SMA matters, so take plain means
+        recent_data = _as_f64(data)[-period:]
+        sma_short = recent_data[-(period // 2):].mean()
+        sma_long = recent_data.mean()
         
-        if sma_short[-1] > sma_long[-1]:
+        if sma_short > sma_long:
             return "UPTREND"
-        elif sma_short[-1] < sma_long[-1]:
+        elif sma_short < sma_long:
             return "DOWNTREND"
         else:
             return "SIDEWAYS"
@@ -3,9 +3,11 @@ Market utility functions for Sandy Viper Bot
 Handles market-specific calculations and data processing
 """
 
-from typing import Dict, List, Optional, Tuple, Union
+import functools
+from typing import Callable, Dict, List, Optional, Tuple, Union
 from datetime import datetime
 import re
+import numpy as np
 
 
 class MarketUtils:
@@ -34,31 +36,22 @@ class MarketUtils:
     # Option symbols pattern
     OPTION_PATTERN = re.compile(r'^(\w+)(\d{2})(\w{3})(\d{2})(\d+)(CE|PE)$')
     
+    # Moneyness labels indexed by the sign of the in-the-money distance, plus one
+    _MONEYNESS_LABELS = np.array(['OTM', 'ATM', 'ITM'])
+    
+    # Month abbreviation to number
+    _MONTH_MAP = {
+        'JAN': 1, 'FEB': 2, 'MAR': 3, 'APR': 4, 'MAY': 5, 'JUN': 6,
+        'JUL': 7, 'AUG': 8, 'SEP': 9, 'OCT': 10, 'NOV': 11, 'DEC': 12
+    }
+    
     @classmethod
     def parse_option_symbol(cls, symbol: str) -> Optional[Dict[str, Union[str, int]]]:
         """Parse option symbol to extract components"""
-        match = cls.OPTION_PATTERN.match(symbol.upper())
-        
-        if not match:
-            return None
-        
-        underlying, year, month, day, strike, option_type = match.groups()
+        parsed = _parse_option_symbol(symbol.upper())
         
-        # Convert month abbreviation to number
-        month_map = {
-            'JAN': 1, 'FEB': 2, 'MAR': 3, 'APR': 4, 'MAY': 5, 'JUN': 6,
-            'JUL': 7, 'AUG': 8, 'SEP': 9, 'OCT': 10, 'NOV': 11, 'DEC': 12
-        }
-        
-        return {
-            'underlying': underlying,
-            'year': 2000 + int(year),
-            'month': month_map.get(month.upper(), 0),
-            'day': int(day),
-            'strike': int(strike),
-            'option_type': option_type,
-            'expiry_date': f"20{year}-{month_map.get(month.upper(), 1):02d}-{day}"
-        }
+        # Callers get their own dict; the cached one stays untouched
+        return dict(parsed) if parsed else None
     
     @classmethod
     def build_option_symbol(cls, underlying: str, expiry: datetime, 
@@ -76,35 +69,48 @@ class MarketUtils:
         return f"{underlying.upper()}{year_suffix}{month_name}{day}{strike}{option_type.upper()}"
     
     @classmethod
+    @functools.lru_cache(maxsize=256)
     def get_lot_size(cls, symbol: str) -> int:
         """Get lot size for a symbol"""
-        # Extract base symbol
-        base_symbol = symbol.split('_')[0] if '_' in symbol else symbol
+        # Extract base symbol; plain index/stock names skip the regex
+        base_symbol = symbol.partition('_')[0].upper()
+        direct = cls.LOT_SIZES.get(base_symbol)
+        if direct is not None:
+            return direct
         
         # For options, extract underlying
-        parsed = cls.parse_option_symbol(base_symbol)
+        parsed = _parse_option_symbol(base_symbol)
         if parsed:
             base_symbol = parsed['underlying']
         
-        return cls.LOT_SIZES.get(base_symbol.upper(), 1)
+        return cls.LOT_SIZES.get(base_symbol, 1)
     
     @classmethod
+    @functools.lru_cache(maxsize=256)
     def get_strike_interval(cls, symbol: str) -> int:
         """Get strike price interval for a symbol"""
-        base_symbol = symbol.split('_')[0] if '_' in symbol else symbol
+        # Extract base symbol; plain index/stock names skip the regex
+        base_symbol = symbol.partition('_')[0].upper()
+        direct = cls.STRIKE_INTERVALS.get(base_symbol)
+        if direct is not None:
+            return direct
         
         # For options, extract underlying
-        parsed = cls.parse_option_symbol(base_symbol)
+        parsed = _parse_option_symbol(base_symbol)
         if parsed:
             base_symbol = parsed['underlying']
         
-        return cls.STRIKE_INTERVALS.get(base_symbol.upper(), 50)
+        return cls.STRIKE_INTERVALS.get(base_symbol, 50)
     
     @classmethod
     def round_to_strike(cls, price: float, symbol: str) -> int:
         """Round price to nearest strike price"""
-        interval = cls.get_strike_interval(symbol)
-        return int(round(price / interval) * interval)
+        return _strike_rounder(cls.get_strike_interval(symbol))(price)
+    
+    @classmethod
+    def strike_rounder(cls, symbol: str) -> Callable[[float], int]:
+        """Get a round_to_strike function with the symbol's interval baked in"""
+        return _strike_rounder(cls.get_strike_interval(symbol))
     
     @classmethod
     def get_atm_strike(cls, spot_price: float, symbol: str) -> int:
@@ -115,15 +121,16 @@ class MarketUtils:
     def get_otm_strikes(cls, spot_price: float, symbol: str, 
                        num_strikes: int = 5) -> Tuple[List[int], List[int]]:
         """Get Out-of-The-Money strike prices"""
-        atm_strike = cls.get_atm_strike(spot_price, symbol)
         interval = cls.get_strike_interval(symbol)
+        atm_strike = _strike_rounder(interval)(spot_price)
+        
+        offsets = np.arange(1, num_strikes + 1, dtype=np.int64) * interval
         
         # Call strikes (above ATM)
-        call_strikes = [atm_strike + (i * interval) for i in range(1, num_strikes + 1)]
+        call_strikes = (atm_strike + offsets).tolist()
         
-        # Put strikes (below ATM)
-        put_strikes = [atm_strike - (i * interval) for i in range(1, num_strikes + 1)]
-        put_strikes.reverse()  # Arrange in ascending order
+        # Put strikes (below ATM), in ascending order
+        put_strikes = (atm_strike - offsets[::-1]).tolist()
         
         return put_strikes, call_strikes
     
@@ -138,14 +145,10 @@ class MarketUtils:
         interval = cls.get_strike_interval(symbol)
         
         # Find strikes within range
-        strikes = []
-        strike = cls.round_to_strike(lower_bound, symbol)
-        
-        while strike <= upper_bound:
-            strikes.append(strike)
-            strike += interval
+        first_strike = _strike_rounder(interval)(lower_bound)
+        count = max(int((upper_bound - first_strike) // interval) + 1, 0)
         
-        return strikes
+        return (first_strike + np.arange(count, dtype=np.int64) * interval).tolist()
     
     @classmethod
     def calculate_option_moneyness(cls, spot_price: float, strike_price: int, 
@@ -175,6 +178,24 @@ class MarketUtils:
             'percentage_distance': abs(spot_price - strike_price) / spot_price * 100
         }
     
+    @classmethod
+    def calculate_option_moneyness_batch(cls, spot_price: float, strike_prices: Union[List[int], np.ndarray],
+                                         option_type: str) -> Dict[str, np.ndarray]:
+        """Calculate option moneyness for many strikes at once"""
+        strikes = np.asarray(strike_prices, dtype=np.float64)
+        diff = spot_price - strikes
+        
+        if option_type.upper() != 'CE':  # Put option
+            diff = -diff
+        distance = np.abs(diff)
+        
+        return {
+            'intrinsic_value': np.maximum(diff, 0.0),
+            'moneyness': cls._MONEYNESS_LABELS[np.sign(diff).astype(np.intp) + 1],
+            'distance_from_spot': distance,
+            'percentage_distance': distance / spot_price * 100
+        }
+    
     @classmethod
     def get_expiry_day_strikes(cls, symbol: str) -> Dict[str, List[int]]:
         """Get typical expiry day strike ranges"""
@@ -217,6 +238,13 @@ class MarketUtils:
         distance_percent = abs(spot_price - strike_price) / spot_price * 100
         return distance_percent <= max_distance_percent
     
+    @classmethod
+    def is_liquid_strike_batch(cls, spot_price: float, strike_prices: Union[List[int], np.ndarray],
+                               max_distance_percent: float = 5.0) -> np.ndarray:
+        """Boolean mask of strikes likely to be liquid"""
+        strikes = np.asarray(strike_prices, dtype=np.float64)
+        return np.abs(spot_price - strikes) / spot_price * 100 <= max_distance_percent
+    
     @classmethod
     def get_liquid_strikes(cls, spot_price: float, symbol: str, 
                           option_type: str = 'BOTH') -> List[int]:
@@ -261,3 +289,34 @@ class MarketUtils:
             'net_margin': max(0, net_margin),  # Cannot be negative
             'lots': lots
         }
+
+
+@functools.lru_cache(maxsize=8192)
+def _parse_option_symbol(symbol: str) -> Optional[Dict[str, Union[str, int]]]:
+    """Parse an upper-cased option symbol; symbols repeat, so results are cached"""
+    match = MarketUtils.OPTION_PATTERN.match(symbol)
+    
+    if not match:
+        return None
+    
+    underlying, year, month, day, strike, option_type = match.groups()
+    month_number = MarketUtils._MONTH_MAP.get(month)
+    
+    return {
+        'underlying': underlying,
+        'year': 2000 + int(year),
+        'month': month_number or 0,
+        'day': int(day),
+        'strike': int(strike),
+        'option_type': option_type,
+        'expiry_date': f"20{year}-{month_number or 1:02d}-{day}"
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def _strike_rounder(interval: int) -> Callable[[float], int]:
+    """Build the rounding function for one strike interval"""
+    def round_to_interval(price: float) -> int:
+        return int(round(price / interval) * interval)
+    
+    return round_to_interval
@@ -13,16 +13,20 @@ class ValidationUtils:
     """Data validation utilities"""
     
     # Regex patterns
-    SYMBOL_PATTERN = re.compile(r'^[A-Z][A-Z0-9_]*$')
-    OPTION_SYMBOL_PATTERN = re.compile(r'^[A-Z]+\d{2}[A-Z]{3}\d{2}\d+(CE|PE)$')
-    PHONE_PATTERN = re.compile(r'^\+?[\d\s\-\(\)]{10,15}$')
-    EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+    # Patterns are anchored by fullmatch(), so they carry no ^/$
+    SYMBOL_PATTERN = re.compile(r'[A-Z][A-Z0-9_]*')
+    OPTION_SYMBOL_PATTERN = re.compile(r'[A-Z]+\d{2}[A-Z]{3}\d{2}\d+(CE|PE)')
+    PHONE_PATTERN = re.compile(r'\+?[\d\s\-\(\)]{10,15}')
+    EMAIL_PATTERN = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+    _TIME_PATTERN = re.compile(r'([01]?\d|2[0-3]):[0-5]\d')
+    _UNSAFE_CHARS = str.maketrans('', '', '<>"\'')
+    _NON_NUMERIC_CHARS = re.compile(r'[^\d\.\-]')
     
     # Order types
-    VALID_ORDER_TYPES = ['MARKET', 'LIMIT', 'SL', 'SL-M']
-    VALID_TRANSACTION_TYPES = ['BUY', 'SELL']
-    VALID_PRODUCT_TYPES = ['CNC', 'MIS', 'NRML']
-    VALID_VALIDITY_TYPES = ['DAY', 'IOC', 'TTL']
+    VALID_ORDER_TYPES = frozenset({'MARKET', 'LIMIT', 'SL', 'SL-M'})
+    VALID_TRANSACTION_TYPES = frozenset({'BUY', 'SELL'})
+    VALID_PRODUCT_TYPES = frozenset({'CNC', 'MIS', 'NRML'})
+    VALID_VALIDITY_TYPES = frozenset({'DAY', 'IOC', 'TTL'})
     
     @classmethod
     def validate_symbol(cls, symbol: str) -> bool:
@@ -30,7 +34,7 @@ class ValidationUtils:
         if not isinstance(symbol, str):
             return False
         
-        return bool(cls.SYMBOL_PATTERN.match(symbol.upper()))
+        return bool(cls.SYMBOL_PATTERN.fullmatch(symbol.upper()))
     
     @classmethod
     def validate_option_symbol(cls, symbol: str) -> bool:
@@ -38,7 +42,7 @@ class ValidationUtils:
         if not isinstance(symbol, str):
             return False
         
-        return bool(cls.OPTION_SYMBOL_PATTERN.match(symbol.upper()))
+        return bool(cls.OPTION_SYMBOL_PATTERN.fullmatch(symbol.upper()))
     
     @classmethod
     def validate_price(cls, price: Union[int, float, str], min_price: float = 0.05) -> bool:
@@ -61,17 +65,18 @@ class ValidationUtils:
     @classmethod
     def validate_order_type(cls, order_type: str) -> bool:
         """Validate order type"""
-        return order_type.upper() in cls.VALID_ORDER_TYPES
+        # Most callers already pass upper case; skip the copy for them
+        return order_type in cls.VALID_ORDER_TYPES or order_type.upper() in cls.VALID_ORDER_TYPES
     
     @classmethod
     def validate_transaction_type(cls, transaction_type: str) -> bool:
         """Validate transaction type"""
-        return transaction_type.upper() in cls.VALID_TRANSACTION_TYPES
+        return transaction_type in cls.VALID_TRANSACTION_TYPES or transaction_type.upper() in cls.VALID_TRANSACTION_TYPES
     
     @classmethod
     def validate_product_type(cls, product_type: str) -> bool:
         """Validate product type"""
-        return product_type.upper() in cls.VALID_PRODUCT_TYPES
+        return product_type in cls.VALID_PRODUCT_TYPES or product_type.upper() in cls.VALID_PRODUCT_TYPES
     
     @classmethod
     def validate_email(cls, email: str) -> bool:
@@ -79,7 +84,7 @@ class ValidationUtils:
         if not isinstance(email, str):
             return False
         
-        return bool(cls.EMAIL_PATTERN.match(email))
+        return bool(cls.EMAIL_PATTERN.fullmatch(email))
     
     @classmethod
     def validate_phone(cls, phone: str) -> bool:
@@ -87,7 +92,7 @@ class ValidationUtils:
         if not isinstance(phone, str):
             return False
         
-        return bool(cls.PHONE_PATTERN.match(phone))
+        return bool(cls.PHONE_PATTERN.fullmatch(phone))
     
     @classmethod
     def validate_date_range(cls, start_date: date, end_date: date) -> bool:
@@ -107,49 +112,39 @@ class ValidationUtils:
         except (ValueError, TypeError):
             return False
     
+    # Required order fields and their validators, checked in this order
+    _ORDER_VALIDATORS = (
+        ('symbol', validate_symbol.__func__),
+        ('quantity', validate_quantity.__func__),
+        ('order_type', validate_order_type.__func__),
+        ('transaction_type', validate_transaction_type.__func__),
+        ('product', validate_product_type.__func__),
+    )
+    
     @classmethod
     def validate_order_params(cls, order_data: Dict[str, Any]) -> Dict[str, List[str]]:
         """Validate complete order parameters"""
-        errors = {}
-        
-        # Required fields
-        required_fields = ['symbol', 'quantity', 'order_type', 'transaction_type', 'product']
-        
-        for field in required_fields:
-            if field not in order_data or order_data[field] is None:
-                errors.setdefault('missing_fields', []).append(field)
-        
-        # Validate individual fields
-        if 'symbol' in order_data:
-            if not cls.validate_symbol(order_data['symbol']):
-                errors.setdefault('invalid_fields', []).append('symbol')
-        
-        if 'quantity' in order_data:
-            if not cls.validate_quantity(order_data['quantity']):
-                errors.setdefault('invalid_fields', []).append('quantity')
+        missing = [field for field, _ in cls._ORDER_VALIDATORS if order_data.get(field) is None]
+        invalid = [field for field, validator in cls._ORDER_VALIDATORS
+                   if order_data.get(field) is not None and not validator(cls, order_data[field])]
         
-        if 'order_type' in order_data:
-            if not cls.validate_order_type(order_data['order_type']):
-                errors.setdefault('invalid_fields', []).append('order_type')
-        
-        if 'transaction_type' in order_data:
-            if not cls.validate_transaction_type(order_data['transaction_type']):
-                errors.setdefault('invalid_fields', []).append('transaction_type')
-        
-        if 'product' in order_data:
-            if not cls.validate_product_type(order_data['product']):
-                errors.setdefault('invalid_fields', []).append('product')
+        order_type = (order_data.get('order_type') or '').upper()
         
         # Validate price for limit orders
-        if order_data.get('order_type', '').upper() in ['LIMIT', 'SL']:
+        if order_type in ('LIMIT', 'SL'):
             if 'price' not in order_data or not cls.validate_price(order_data['price']):
-                errors.setdefault('invalid_fields', []).append('price')
+                invalid.append('price')
         
         # Validate trigger price for stop loss orders
-        if order_data.get('order_type', '').upper() in ['SL', 'SL-M']:
+        if order_type in ('SL', 'SL-M'):
             if 'trigger_price' not in order_data or not cls.validate_price(order_data['trigger_price']):
-                errors.setdefault('invalid_fields', []).append('trigger_price')
+                invalid.append('trigger_price')
         
+        errors = {}
+        if missing:
+            errors['missing_fields'] = missing
+        if invalid:
+            errors['invalid_fields'] = invalid
         return errors
     
     @classmethod
@@ -162,7 +157,7 @@ class ValidationUtils:
         sanitized = str(value).strip()
         
         # Remove potentially dangerous characters
-        sanitized = re.sub(r'[<>"\']', '', sanitized)
+        sanitized = sanitized.translate(cls._UNSAFE_CHARS)
         
         # Truncate to max length
         return sanitized[:max_length]
@@ -173,7 +168,7 @@ class ValidationUtils:
         try:
             if isinstance(value, str):
                 # Remove non-numeric characters except decimal point and minus
-                value = re.sub(r'[^\d\.\-]', '', value)
+                value = cls._NON_NUMERIC_CHARS.sub('', value)
             
             num_val = float(value)
             return round(num_val, decimal_places)
@@ -201,10 +196,12 @@ class ValidationUtils:
     @classmethod
     def validate_chat_id(cls, chat_id: Union[str, int]) -> bool:
         """Validate Telegram chat ID"""
+        # Telegram chat IDs can be negative (for groups) or positive (for users)
+        if isinstance(chat_id, int):
+            return chat_id != 0
+        
         try:
-            chat_id_int = int(chat_id)
-            # Telegram chat IDs can be negative (for groups) or positive (for users)
-            return abs(chat_id_int) > 0
+            return int(chat_id) != 0
         except (ValueError, TypeError):
             return False
     
@@ -241,9 +238,7 @@ class ValidationUtils:
     @classmethod
     def validate_time_range(cls, start_time: str, end_time: str) -> bool:
         """Validate time range format (HH:MM)"""
-        time_pattern = re.compile(r'^([0-1]?[0-9]|2[0-3]):[0-5][0-9]$')
-        
-        if not time_pattern.match(start_time) or not time_pattern.match(end_time):
+        if not cls._TIME_PATTERN.fullmatch(start_time) or not cls._TIME_PATTERN.fullmatch(end_time):
             return False
         
         # Convert to minutes for comparison
@@ -6,6 +6,7 @@ Demonstrates all utility functions and their usage
 import sys
 import os
 from datetime import datetime, timedelta
+import numpy as np
 
 # Add the project root to Python path
 sys.path.append('/workspaces/Sandy_Viper-bot')
@@ -27,21 +28,21 @@ def demo_datetime_utils():
     print(f"Current IST Time: {current_time}")
     
     # Market session info
-    session = DateTimeUtils.get_market_session()
+    session = DateTimeUtils.get_market_session(current_time)
     print(f"Current Market Session: {session}")
     
     # Check market status
-    is_open = DateTimeUtils.is_market_open()
+    is_open = DateTimeUtils.is_market_open(current_time)
     print(f"Is Market Open: {'Yes' if is_open else 'No'}")
     
     # Time to market open/close
-    time_to_open = DateTimeUtils.time_to_market_open()
+    time_to_open = DateTimeUtils.time_to_market_open(current_time)
     if time_to_open:
         formatted_time = DateTimeUtils.format_time_duration(time_to_open)
         print(f"Time to Market Open: {formatted_time}")
     
     # Next trading day
-    next_trading_day = DateTimeUtils.get_next_trading_day()
+    next_trading_day = DateTimeUtils.get_next_trading_day(current_time)
     print(f"Next Trading Day: {next_trading_day.strftime('%Y-%m-%d')}")
     
     # Expiry dates for NIFTY
@@ -209,9 +210,9 @@ def demo_file_utils():
     FileUtils.ensure_directory(test_dir)
     print(f"✅ Created test directory: {test_dir}")
     
-    # JSON operations
+    # JSON operations (write_json serializes datetimes itself)
     test_data = {
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": datetime.now(),
         "symbol": "NIFTY",
         "price": 18500.50,
         "volume": 1250000
@@ -263,11 +264,12 @@ def demo_technical_indicators():
     print("=" * 60)
     
     # Sample price data
-    prices = [18400, 18450, 18425, 18475, 18500, 18485, 18520, 18495, 18530, 18510]
-    high_prices = [p + 20 for p in prices]
-    low_prices = [p - 15 for p in prices]
+    # Indicators take float64 arrays directly, so build the series with NumPy
+    prices = np.array([18400, 18450, 18425, 18475, 18500, 18485, 18520, 18495, 18530, 18510], dtype=np.float64)
+    high_prices = prices + 20.0
+    low_prices = prices - 15.0
     
-    print(f"Sample Prices: {prices}")
+    print(f"Sample Prices: {prices.astype(int).tolist()}")
     
     indicators = TechnicalIndicators()
     
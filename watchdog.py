@@ -6,21 +6,38 @@ Monitors system health, trading performance, and handles alerts
 import psutil
 import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from datetime import datetime, timedelta
-from typing import Dict, List, Callable, Any
+from typing import Dict, List, Callable, Any, Deque, Optional, Tuple
 from trade_logger import trade_logger
 from lot_manager import lot_manager
 from nse_data import nse_data
+from utils.datetime_utils import DateTimeUtils
+from zerodha_auth import zerodha_auth
+from kite_api import kite_api, flush_queue
+
+# This bot's own process, reused so psutil keeps its CPU-time baseline
+_PROC = psutil.Process()
 
 
 class SystemWatchdog:
     """System monitoring and alerting"""
     
+    # Component statuses that count towards an overall HEALTHY
+    _HEALTHY_STATUSES = frozenset({"HEALTHY", "CONNECTED", "ACTIVE", "IDLE"})
+    
     def __init__(self, check_interval: int = 60):  # Check every minute
         self.check_interval = check_interval
         self.is_running = False
         self.watchdog_thread = None
-        self.alerts: List[Dict] = []
+        self._stop_evt = threading.Event()
+        # (monotonic time, alert) pairs, oldest first; old alerts fall off the left
+        self.alerts: Deque[Tuple[float, Dict]] = deque(maxlen=1000)
+        # Guards the alert deques; alerts come from the watchdog thread, reads from anywhere
+        self._alerts_lock = threading.Lock()
+        # Monotonic times of alerts raised within the last hour, oldest first
+        self._last_hour_alert_times: Deque[float] = deque()
         self.alert_callbacks: List[Callable] = []
         
         # Thresholds
@@ -29,6 +46,23 @@ class SystemWatchdog:
         self.disk_threshold = 90.0  # Disk usage %
         self.max_loss_threshold = -5000.0  # Max daily loss
         self.connection_timeout = 30  # Seconds
+        self.disk_cache_ttl = 300.0  # Seconds between disk usage reads
+        self.market_warmup = timedelta(minutes=15)  # Start full checks this early
+        self.off_hours_probe_interval = 3600.0  # Seconds between API probes while closed
+        
+        # (monotonic read time, usage) of the last disk_usage call
+        self._disk_cache = (0.0, None)
+        
+        # Last connectivity result and its monotonic time, reused while the market is closed
+        self._last_connectivity: Dict[str, Any] = {}
+        self._last_probe_at: Optional[float] = None
+        
+        # Worker for the Kite probe, created on first connectivity check
+        self._probe_pool: Optional[ThreadPoolExecutor] = None
+        
+        # Prime psutil's CPU baselines so each check measures the time since the last one
+        psutil.cpu_percent(interval=None)
+        _PROC.cpu_percent(interval=None)
         
         # Status tracking
         self.last_health_check = None
@@ -54,7 +88,11 @@ class SystemWatchdog:
             'severity': severity
         }
         
-        self.alerts.append(alert)
+        now = time.monotonic()
+        with self._alerts_lock:
+            self.alerts.append((now, alert))
+            self._last_hour_alert_times.append(now)
+            self._prune_last_hour_alerts(now)
         trade_logger.log_warning(f"ALERT [{alert_type}]: {message}")
         
         # Notify callbacks
@@ -64,12 +102,23 @@ class SystemWatchdog:
             except Exception as e:
                 trade_logger.log_error(f"Alert callback error: {str(e)}")
     
-    def check_system_resources(self) -> Dict[str, Any]:
+    def check_system_resources(self, timestamp: Optional[str] = None) -> Dict[str, Any]:
         """Check system resource usage"""
         try:
-            cpu_percent = psutil.cpu_percent(interval=1)
+            cpu_percent = psutil.cpu_percent(interval=None)
             memory = psutil.virtual_memory()
-            disk = psutil.disk_usage('/')
+            
+            # Disk usage changes slowly; don't stat the filesystem every cycle
+            read_at, disk = self._disk_cache
+            now = time.monotonic()
+            if disk is None or now - read_at > self.disk_cache_ttl:
+                disk = psutil.disk_usage('/')
+                self._disk_cache = (now, disk)
+            
+            # Own-process stats for leak spotting; oneshot reads /proc once for both
+            with _PROC.oneshot():
+                process_rss = _PROC.memory_info().rss
+                process_cpu = _PROC.cpu_percent(interval=None)
             
             system_info = {
                 'cpu_usage': cpu_percent,
@@ -77,7 +126,9 @@ class SystemWatchdog:
                 'memory_available': memory.available,
                 'disk_usage': disk.percent,
                 'disk_free': disk.free,
-                'timestamp': datetime.now().isoformat()
+                'process_memory_rss': process_rss,
+                'process_cpu_usage': process_cpu,
+                'timestamp': timestamp or datetime.now().isoformat()
             }
             
             # Check thresholds
@@ -103,7 +154,7 @@ class SystemWatchdog:
             self.system_status = "ERROR"
             return {}
     
-    def check_trading_performance(self) -> Dict[str, Any]:
+    def check_trading_performance(self, timestamp: Optional[str] = None) -> Dict[str, Any]:
         """Check trading performance and risk metrics"""
         try:
             position_summary = lot_manager.get_position_summary()
@@ -114,7 +165,7 @@ class SystemWatchdog:
                 'net_pnl': position_summary.get('net_pnl', 0),
                 'open_positions': position_summary.get('total_positions', 0),
                 'risk_utilization': position_summary.get('risk_utilization', 0),
-                'timestamp': datetime.now().isoformat()
+                'timestamp': timestamp or datetime.now().isoformat()
             }
             
             # Check risk thresholds
@@ -137,38 +188,53 @@ class SystemWatchdog:
             self.trading_status = "ERROR"
             return {}
     
-    def check_api_connectivity(self) -> Dict[str, Any]:
+    def _probe_nse(self) -> Tuple[Any, float]:
+        """Fetch NSE market status, returning it with the response time"""
+        start_time = time.time()
+        market_status = nse_data.get_market_status()
+        return market_status, time.time() - start_time
+    
+    def _probe_kite(self) -> Tuple[str, Optional[float]]:
+        """Check Kite auth and margins, returning status and response time"""
+        kite_response_time = None
+        kite_status = "NOT_AUTHENTICATED"
+        
+        try:
+            if zerodha_auth.is_authenticated():
+                start_time = time.time()
+                margins = kite_api.get_margins()
+                kite_response_time = time.time() - start_time
+                kite_status = "CONNECTED" if margins.get("status") == "success" else "ERROR"
+                # Flush any queued orders on restored connectivity
+                if kite_status == "CONNECTED":
+                    try:
+                        res = flush_queue()
+                        if res.get('placed'):
+                            trade_logger.log_info(f"Flushed queued orders: {res}")
+                    except Exception as _e:
+                        trade_logger.log_warning(f"Queue flush failed: {_e}")
+        except Exception:
+            kite_status = "ERROR"
+        
+        return kite_status, kite_response_time
+    
+    def check_api_connectivity(self, timestamp: Optional[str] = None) -> Dict[str, Any]:
         """Check API connectivity and response times"""
         try:
-            start_time = time.time()
+            # NSE and Kite are independent, so probe Kite in the background
+            if self._probe_pool is None:
+                self._probe_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="wd-probe")
+            kite_future = self._probe_pool.submit(self._probe_kite)
             
             # Test market data API
-            market_status = nse_data.get_market_status()
-            nse_response_time = time.time() - start_time
+            market_status, nse_response_time = self._probe_nse()
             
             # Test Kite API (if authenticated)
-            kite_response_time = None
-            kite_status = "NOT_AUTHENTICATED"
-            
             try:
-                from zerodha_auth import zerodha_auth
-                if zerodha_auth.is_authenticated():
-                    start_time = time.time()
-                    from kite_api import kite_api
-                    margins = kite_api.get_margins()
-                    kite_response_time = time.time() - start_time
-                    kite_status = "CONNECTED" if margins.get("status") == "success" else "ERROR"
-                    # Flush any queued orders on restored connectivity
-                    if kite_status == "CONNECTED":
-                        try:
-                            from kite_api import flush_queue
-                            res = flush_queue()
-                            if res.get('placed'):
-                                trade_logger.log_info(f"Flushed queued orders: {res}")
-                        except Exception as _e:
-                            trade_logger.log_warning(f"Queue flush failed: {_e}")
-            except Exception:
-                kite_status = "ERROR"
+                kite_status, kite_response_time = kite_future.result(timeout=self.connection_timeout)
+            except FutureTimeoutError:
+                kite_status, kite_response_time = "ERROR", None
+                self._send_alert("API", f"Kite API check timed out after {self.connection_timeout}s", "WARNING")
             
             connectivity = {
                 'nse_api': {
@@ -179,7 +245,7 @@ class SystemWatchdog:
                     'status': kite_status,
                     'response_time': kite_response_time
                 },
-                'timestamp': datetime.now().isoformat()
+                'timestamp': timestamp or datetime.now().isoformat()
             }
             
             # Check response times
@@ -203,11 +269,32 @@ class SystemWatchdog:
     
     def perform_health_check(self) -> Dict[str, Any]:
         """Perform comprehensive health check"""
+        # One timestamp for the whole check instead of one per section
+        timestamp = datetime.now().isoformat()
+        system = self.check_system_resources(timestamp)
+        
+        # Outside market hours only probe the APIs occasionally to catch outages
+        ist_now = DateTimeUtils.get_current_ist_time()
+        market_active = (DateTimeUtils.is_market_open(ist_now)
+                         or DateTimeUtils.is_market_open(ist_now + self.market_warmup))
+        
+        if market_active:
+            trading = self.check_trading_performance(timestamp)
+        else:
+            trading = {'status': 'SKIPPED_MARKET_CLOSED', 'timestamp': timestamp}
+            self.trading_status = "IDLE"
+        
+        now = time.monotonic()
+        if (market_active or self._last_probe_at is None
+                or now - self._last_probe_at >= self.off_hours_probe_interval):
+            self._last_connectivity = self.check_api_connectivity(timestamp)
+            self._last_probe_at = now
+        
         health_data = {
-            'timestamp': datetime.now().isoformat(),
-            'system': self.check_system_resources(),
-            'trading': self.check_trading_performance(),
-            'connectivity': self.check_api_connectivity(),
+            'timestamp': timestamp,
+            'system': system,
+            'trading': trading,
+            'connectivity': self._last_connectivity,
             'overall_status': self._determine_overall_status()
         }
         
@@ -217,25 +304,25 @@ class SystemWatchdog:
     
     def _determine_overall_status(self) -> str:
         """Determine overall system status"""
-        if all(status in ["HEALTHY", "CONNECTED", "ACTIVE", "IDLE"] 
-               for status in [self.system_status, self.api_status, self.trading_status]):
+        healthy = self._HEALTHY_STATUSES
+        if (self.system_status in healthy and self.api_status in healthy
+                and self.trading_status in healthy):
             return "HEALTHY"
-        elif any(status == "ERROR" 
-                for status in [self.system_status, self.api_status, self.trading_status]):
+        elif "ERROR" in (self.system_status, self.api_status, self.trading_status):
             return "ERROR"
         else:
             return "DEGRADED"
     
     def _watchdog_loop(self) -> None:
         """Main watchdog monitoring loop"""
-        while self.is_running:
+        while not self._stop_evt.is_set():
             try:
                 self.perform_health_check()
-                time.sleep(self.check_interval)
-                
             except Exception as e:
                 trade_logger.log_error(f"Watchdog loop error: {str(e)}")
-                time.sleep(self.check_interval)
+            
+            # Wakes immediately on stop()
+            self._stop_evt.wait(self.check_interval)
     
     def start(self) -> None:
         """Start the watchdog service"""
@@ -244,6 +331,7 @@ class SystemWatchdog:
             return
         
         self.is_running = True
+        self._stop_evt.clear()
         self.watchdog_thread = threading.Thread(target=self._watchdog_loop, daemon=True)
         self.watchdog_thread.start()
         
@@ -255,31 +343,54 @@ class SystemWatchdog:
             return
         
         self.is_running = False
+        self._stop_evt.set()
         
         if self.watchdog_thread and self.watchdog_thread.is_alive():
             self.watchdog_thread.join(timeout=5)
         
+        if self._probe_pool is not None:
+            self._probe_pool.shutdown(wait=False)
+            self._probe_pool = None
+        
         trade_logger.log_info("Watchdog service stopped")
     
+    def _prune_last_hour_alerts(self, now: float) -> None:
+        """Drop alert times older than an hour from the rolling window (hold _alerts_lock)"""
+        times = self._last_hour_alert_times
+        while times and now - times[0] >= 3600:
+            times.popleft()
+    
     def get_recent_alerts(self, hours: int = 24) -> List[Dict]:
         """Get recent alerts"""
-        cutoff_time = datetime.now() - timedelta(hours=hours)
+        cutoff_time = time.monotonic() - hours * 3600
+        
+        with self._alerts_lock:
+            alerts = list(self.alerts)
         
+        # Alerts are stored in time order, so stop at the first one too old
         recent_alerts = []
-        for alert in self.alerts:
-            alert_time = datetime.fromisoformat(alert['timestamp'])
-            if alert_time > cutoff_time:
-                recent_alerts.append(alert)
+        for alert_time, alert in reversed(alerts):
+            if alert_time <= cutoff_time:
+                break
+            recent_alerts.append(alert)
         
+        recent_alerts.reverse()
         return recent_alerts
     
     def clear_alerts(self) -> None:
         """Clear all alerts"""
-        self.alerts.clear()
+        with self._alerts_lock:
+            self.alerts.clear()
+            self._last_hour_alert_times.clear()
         trade_logger.log_info("Alerts cleared")
     
     def get_status_summary(self) -> Dict[str, Any]:
         """Get status summary"""
+        with self._alerts_lock:
+            self._prune_last_hour_alerts(time.monotonic())
+            recent_alerts_count = len(self._last_hour_alert_times)
+            total_alerts = len(self.alerts)
+        
         return {
             'overall_status': self._determine_overall_status(),
             'system_status': self.system_status,
@@ -287,8 +398,8 @@ class SystemWatchdog:
             'api_status': self.api_status,
             'last_health_check': self.last_health_check.isoformat() if self.last_health_check else None,
             'is_running': self.is_running,
-            'recent_alerts_count': len(self.get_recent_alerts(1)),  # Last hour
-            'total_alerts': len(self.alerts)
+            'recent_alerts_count': recent_alerts_count,  # Last hour
+            'total_alerts': total_alerts
         }
 
 
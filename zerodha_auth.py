@@ -4,8 +4,11 @@ Handles Kite Connect API authentication and token management
 """
 
 import hashlib
+import time
 import requests
-from typing import Optional, Dict, Any
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Optional, Dict, Any, Tuple
 from datetime import datetime, timedelta
 from config import config
 from trade_logger import trade_logger
@@ -22,11 +25,27 @@ class ZerodhaAuth:
         self.login_url = "https://kite.zerodha.com/connect/login"
         self.session_url = "https://api.kite.trade/session/token"
         self.profile_url = "https://api.kite.trade/user/profile"
+        self.request_timeout = (3, 10)  # (connect, read) seconds
+        self.validation_ttl = 45.0  # Seconds a successful profile check is trusted
+        # (access_token, monotonic validated_at) of the last successful validation
+        self._validation_cache: Optional[Tuple[str, float]] = None
+        
+        # Keep-alive session so repeated Kite calls reuse pooled connections
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=32,
+            max_retries=Retry(total=3, backoff_factor=0.2,
+                              status_forcelist=[429, 500, 502, 503, 504])
+        ))
+        self.session.headers.update({"X-Kite-Version": "3"})
     
     def generate_checksum(self, api_key: str, request_token: str, api_secret: str) -> str:
         """Generate checksum for authentication"""
-        data = api_key + request_token + api_secret
-        return hashlib.sha256(data.encode()).hexdigest()
+        checksum = hashlib.sha256(api_key.encode())
+        checksum.update(request_token.encode())
+        checksum.update(api_secret.encode())
+        return checksum.hexdigest()
     
     def get_login_url(self) -> str:
         """Get Zerodha login URL"""
@@ -34,6 +53,7 @@ class ZerodhaAuth:
     
     def generate_session(self, request_token: str) -> Dict[str, Any]:
         """Generate session using request token"""
+        self.invalidate_validation_cache()
         try:
             checksum = self.generate_checksum(self.api_key, request_token, self.api_secret)
             
@@ -43,7 +63,7 @@ class ZerodhaAuth:
                 "checksum": checksum
             }
             
-            response = requests.post(self.session_url, data=data)
+            response = self.session.post(self.session_url, data=data, timeout=self.request_timeout)
             response.raise_for_status()
             
             session_data = response.json()
@@ -65,25 +85,40 @@ class ZerodhaAuth:
             trade_logger.log_error(f"Authentication error: {str(e)}")
             raise
     
-    def validate_session(self) -> bool:
-        """Validate current session"""
+    def invalidate_validation_cache(self) -> None:
+        """Drop the cached session validation result"""
+        self._validation_cache = None
+    
+    def validate_session(self, force: bool = False) -> bool:
+        """Validate current session
+        
+        A successful check is trusted for ``validation_ttl`` seconds per
+        access token; pass ``force=True`` to always hit the profile API.
+        """
         if not self.access_token:
             return False
         
+        cached = self._validation_cache
+        if not force and cached is not None:
+            cached_token, validated_at = cached
+            # Hits do not extend the TTL, so a revoked token is noticed within it
+            if cached_token == self.access_token and time.monotonic() - validated_at < self.validation_ttl:
+                return True
+        
         try:
-            headers = {
-                "Authorization": f"token {self.api_key}:{self.access_token}",
-                "X-Kite-Version": "3"
-            }
+            # X-Kite-Version is a session default
+            headers = {"Authorization": f"token {self.api_key}:{self.access_token}"}
             
-            response = requests.get(self.profile_url, headers=headers)
+            response = self.session.get(self.profile_url, headers=headers, timeout=self.request_timeout)
             
             if response.status_code == 200:
                 profile_data = response.json()
                 if profile_data.get("status") == "success":
+                    self._validation_cache = (self.access_token, time.monotonic())
                     trade_logger.log_info("Session validation successful")
                     return True
             
+            self.invalidate_validation_cache()
             trade_logger.log_warning("Session validation failed")
             return False
             
@@ -111,9 +146,10 @@ class ZerodhaAuth:
             logout_url = "https://api.kite.trade/session/token"
             headers = self.get_auth_headers()
             
-            response = requests.delete(logout_url, headers=headers)
+            response = self.session.delete(logout_url, headers=headers, timeout=self.request_timeout)
             
             if response.status_code == 200:
+                self.invalidate_validation_cache()
                 self.access_token = None
                 self.public_token = None
                 config.kite.access_token = ""